@@ -2,8 +2,10 @@
 
 import asyncio
 import logging
+from collections.abc import Awaitable, Callable
 from typing import Any
 
+from aiohttp import ClientError
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import EVENT_HOMEASSISTANT_STOP, Platform
 from homeassistant.core import Event, HomeAssistant, callback
@@ -11,16 +13,38 @@ from homeassistant.exceptions import ConfigEntryAuthFailed, ConfigEntryNotReady
 from homeassistant.helpers import device_registry as dr
 from surepcio import Household, SurePetcareClient
 
+from .api import (
+    SETUP,
+    SurePetcareApi,
+    async_get_client_pool,
+    async_get_rate_limiter,
+)
 from .const import (
+    BACKGROUND_SETUP,
     CLIENT_DEVICE_ID,
+    DEFAULT_OFFLINE_QUEUE_TTL,
+    DEFAULT_TIMEOUT_SETUP,
     DOMAIN,
     HOUSEHOLD_ID,
     MANUAL_PROPERTIES,
+    OFFLINE_QUEUE,
+    OFFLINE_QUEUE_TTL,
     OPTION_PROPERTIES,
+    SNAPSHOT_CACHE,
+    STARTUP_REFRESH_CONCURRENCY,
+    TIMEOUT_SETUP,
     TOKEN,
 )
-from .coordinator import SurePetcareConfigEntry, SurePetCareDeviceDataUpdateCoordinator
+from .coordinator import (
+    SurePetcareConfigEntry,
+    SurePetCareDeviceDataUpdateCoordinator,
+    SurePetCareHouseholdDataUpdateCoordinator,
+    household_polling_interval,
+)
+from .offline import OfflineCommandStore
+from .polling import poll_phases, stable_fraction
 from .services import _service_registry
+from .snapshot import DeviceSnapshotStore
 
 logger = logging.getLogger(__name__)
 
@@ -72,50 +96,139 @@ async def async_migrate_entry(hass: HomeAssistant, config_entry: ConfigEntry) ->
     return True
 
 
-async def setup_devices(hass, entry) -> tuple[SurePetcareClient, list[Any]]:
-    """Setup devices for a config entry."""
-    client: SurePetcareClient = SurePetcareClient()
+async def login(hass: HomeAssistant, entry: ConfigEntry) -> SurePetcareApi:
+    """Return the client for a config entry, shared with entries of its account."""
+    token = entry.data.get(TOKEN)
+
+    async def create_client() -> SurePetcareClient:
+        client: SurePetcareClient = SurePetcareClient()
+        async with asyncio.timeout(
+            entry.options.get(TIMEOUT_SETUP, DEFAULT_TIMEOUT_SETUP)
+        ):
+            await client.login(token=token, device_id=entry.data.get(CLIENT_DEVICE_ID))
+        return client
+
+    clients = async_get_client_pool(hass)
     try:
-        await client.login(
-            token=entry.data.get(TOKEN), device_id=entry.data.get(CLIENT_DEVICE_ID)
-        )
+        client = await clients.acquire(token, create_client)
+    except (TimeoutError, ClientError) as exc:
+        raise ConfigEntryNotReady("Could not reach Sure Petcare") from exc
     except Exception as exc:
         raise ConfigEntryAuthFailed from exc
 
-    async def close_client(event: Event | None = None) -> None:
-        """Close the client - on hass-stop, and again on entry unload/reload."""
-        await client.close()
+    released = False
+
+    async def release_client(event: Event | None = None) -> None:
+        """Release the client - on hass-stop, or on entry unload/reload."""
+        nonlocal released
+        if not released:
+            released = True
+            await clients.release(token)
 
     # Both listeners are needed: hass-stop doesn't unload entries, and
     # unload/reload doesn't fire on a full hass stop.
     entry.async_on_unload(
-        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, close_client)
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, release_client)
+    )
+    entry.async_on_unload(release_client)
+    async_get_rate_limiter(hass, token, entry.options)
+    return SurePetcareApi(
+        hass,
+        client,
+        entry.data.get(HOUSEHOLD_ID) or entry.entry_id,
+        entry.options,
+        token,
     )
-    entry.async_on_unload(close_client)
-    # Fetch initial devices
+
+
+async def fetch_devices(entry: ConfigEntry, api: SurePetcareApi) -> list[Any]:
+    """Fetch the pets and devices of a config entry."""
+    household_id = entry.data.get(HOUSEHOLD_ID)
     try:
-        household_id = entry.data.get(HOUSEHOLD_ID)
         if household_id:
-            all_households: list[Household] = await client.api(
-                Household.get_households()
+            all_households: list[Household] = await api.api(
+                Household.get_households(), SETUP
             )
             households = [h for h in all_households if h.id == household_id]
         else:
             # Legacy entries pre-dating per-household splits have no HOUSEHOLD_ID;
             # load all households so the entry keeps working until the user reconfigures.
-            households = await client.api(Household.get_households())
+            households = await api.api(Household.get_households(), SETUP)
         entities = []
         for household in households:
-            entities.extend(await client.api(household.get_pets()))
-            entities.extend(await client.api(household.get_devices()))
+            entities.extend(await api.api(household.get_pets(), SETUP))
+            entities.extend(await api.api(household.get_devices(), SETUP))
 
             # Bind pet device assignments
-            await client.api(household.fetch_pet_device_assignments())
-        await client.close()
+            await api.api(household.fetch_pet_device_assignments(), SETUP)
     except Exception as exc:
-        await client.close()
         raise ConfigEntryNotReady("Configuration not finished") from exc
-    return client, entities
+    return entities
+
+
+async def setup_devices(hass, entry) -> tuple[SurePetcareApi, list[Any]]:
+    """Setup devices for a config entry."""
+    api = await login(hass, entry)
+    return api, await fetch_devices(entry, api)
+
+
+async def refresh_coordinators(
+    coordinators: list[SurePetCareDeviceDataUpdateCoordinator],
+    refresh: Callable[[SurePetCareDeviceDataUpdateCoordinator], Awaitable[None]],
+) -> None:
+    """Refresh every coordinator, a few at a time."""
+    limit = asyncio.Semaphore(STARTUP_REFRESH_CONCURRENCY)
+
+    async def limited(coordinator: SurePetCareDeviceDataUpdateCoordinator) -> None:
+        async with limit:
+            await refresh(coordinator)
+
+    await asyncio.gather(*[limited(coordinator) for coordinator in coordinators])
+
+
+async def replace_cached_devices(
+    hass: HomeAssistant,
+    entry: SurePetcareConfigEntry,
+    client: SurePetcareApi,
+    snapshot: DeviceSnapshotStore,
+    household: SurePetCareHouseholdDataUpdateCoordinator | None,
+) -> None:
+    """Swap the devices restored from the snapshot for fresh ones."""
+    coordinators = entry.runtime_data
+    try:
+        devices = await fetch_devices(entry, client)
+    except ConfigEntryNotReady as exc:
+        logger.warning(
+            "Could not fetch devices for %s, keeping cached data: %s",
+            entry.title,
+            exc.__cause__,
+        )
+    else:
+        fresh = {(device.product_id, device.id): device for device in devices}
+        cached = {(c._device.product_id, c._device.id) for c in coordinators}
+        if fresh.keys() != cached:
+            logger.info("Devices of %s changed since the snapshot", entry.title)
+            await snapshot.async_save(devices)
+            hass.config_entries.async_schedule_reload(entry.entry_id)
+            return
+        for coordinator in coordinators:
+            device = coordinator._device
+            coordinator._device = fresh[(device.product_id, device.id)]
+
+    await refresh_in_background(entry, household)
+
+
+async def refresh_in_background(
+    entry: SurePetcareConfigEntry,
+    household: SurePetCareHouseholdDataUpdateCoordinator | None,
+) -> None:
+    """Refresh the coordinators of an entry whose platforms are already set up."""
+    if household is not None:
+        await household.async_refresh()
+    else:
+        await refresh_coordinators(
+            entry.runtime_data, SurePetCareDeviceDataUpdateCoordinator.async_refresh
+        )
 
 
 async def async_setup_entry(
@@ -125,21 +238,77 @@ async def async_setup_entry(
     """Set up surepetcare from a config entry."""
     logger.info("async_setup_entry called for entry_id=%s", entry.entry_id)
 
-    client, entities = await setup_devices(hass, entry)
+    snapshot = DeviceSnapshotStore(hass, entry)
+    use_snapshot = entry.options.get(SNAPSHOT_CACHE, True)
+    cached = await snapshot.async_load() if use_snapshot else None
+    if not use_snapshot:
+        await snapshot.async_remove()
+    if cached:
+        client, entities = await login(hass, entry), cached
+    else:
+        client, entities = await setup_devices(hass, entry)
     # Not sure if needed so disable for now
     # remove_stale_devices(hass, entry, entities)
 
+    offline: OfflineCommandStore | None = None
+    if entry.options.get(OFFLINE_QUEUE, False):
+        offline = OfflineCommandStore(
+            hass,
+            entry,
+            entry.options.get(OFFLINE_QUEUE_TTL, DEFAULT_OFFLINE_QUEUE_TTL),
+        )
+        await offline.async_load()
+
+    phases = poll_phases((device.id for device in entities), client.key)
     coordinators: list[SurePetCareDeviceDataUpdateCoordinator] = [
-        SurePetCareDeviceDataUpdateCoordinator(hass, entry, client, device)
+        SurePetCareDeviceDataUpdateCoordinator(
+            hass, entry, client, device, phase=phases[str(device.id)], offline=offline
+        )
         for device in entities
     ]
+    entry.runtime_data = coordinators
 
-    await asyncio.gather(
-        *[
-            coordinator.async_config_entry_first_refresh()
-            for coordinator in coordinators
-        ]
-    )
+    household: SurePetCareHouseholdDataUpdateCoordinator | None = None
+    if (household_interval := household_polling_interval(entry.options)) is not None:
+        household = SurePetCareHouseholdDataUpdateCoordinator(
+            hass,
+            entry,
+            client,
+            coordinators,
+            household_interval,
+            phase=stable_fraction(client.key),
+        )
+        entry.async_on_unload(
+            household.async_add_listener(household.async_update_devices)
+        )
+
+    if cached:
+        # Entities start from the snapshot; fresh data replaces it shortly.
+        for coordinator in coordinators:
+            coordinator.async_restore(snapshot.saved_at)
+        entry.async_create_background_task(
+            hass,
+            replace_cached_devices(hass, entry, client, snapshot, household),
+            f"{DOMAIN} replace cached devices",
+        )
+    elif entry.options.get(BACKGROUND_SETUP, False):
+        # Don't hold up startup: entities stay unavailable until refreshed.
+        for coordinator in coordinators:
+            coordinator.async_set_pending()
+        entry.async_create_background_task(
+            hass,
+            refresh_in_background(entry, household),
+            f"{DOMAIN} first refresh",
+        )
+    elif household is not None:
+        await household.async_config_entry_first_refresh()
+    else:
+        await refresh_coordinators(
+            coordinators,
+            SurePetCareDeviceDataUpdateCoordinator.async_config_entry_first_refresh,
+        )
+    if use_snapshot:
+        snapshot.async_track(entry, coordinators, save=not cached)
 
     device_registry = dr.async_get(hass)
     for c in coordinators:
@@ -153,7 +322,6 @@ async def async_setup_entry(
             name=device.name,
         )
 
-    entry.runtime_data = coordinators
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
     return True
@@ -166,6 +334,12 @@ async def async_unload_entry(
     return await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the device snapshot and queued writes of a deleted config entry."""
+    await DeviceSnapshotStore(hass, entry).async_remove()
+    await OfflineCommandStore(hass, entry, 0).async_remove()
+
+
 @callback
 def remove_stale_devices(
     hass: HomeAssistant, config_entry: ConfigEntry, devices: list[Any]
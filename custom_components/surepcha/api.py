@@ -0,0 +1,415 @@
+"""Shared request handling for every SurePetcare client call."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import Counter, OrderedDict, deque
+from collections.abc import Callable, Coroutine, Hashable, Mapping
+from types import MappingProxyType
+from typing import Any, TypeVar
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from surepcio import SurePetcareClient
+from surepcio.devices.device import SurePetCareBase
+
+from .const import (
+    CLIENT_POOL,
+    COMMAND_CONCURRENCY,
+    DEFAULT_REQUEST_BURST,
+    DEFAULT_REQUEST_RATE,
+    DEFAULT_TIMEOUT_SETUP,
+    DEFAULT_TIMEOUT_WRITE,
+    RATE_LIMITER,
+    REQUEST_BURST,
+    REQUEST_RATE,
+    SINGLE_FLIGHT,
+    TIMEOUT_API,
+    TIMEOUT_READ,
+    TIMEOUT_SETUP,
+    TIMEOUT_WRITE,
+)
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# A waiting background request is served after at most this many interactive
+# ones, so polling keeps at least a fifth of the request rate.
+BACKGROUND_EVERY = 4
+
+type _Queues = OrderedDict[Hashable, deque[asyncio.Future[None]]]
+
+
+class RateLimiter:
+    """Token bucket limiting the request rate of the whole account.
+
+    Callers waiting for a token are queued per key (household) and served
+    round-robin, so one busy household cannot starve the others. Interactive
+    requests (commands and the refreshes following them) are served before
+    background ones, but never more than BACKGROUND_EVERY in a row while
+    background requests wait.
+    """
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._queues: _Queues = OrderedDict()
+        self._interactive: _Queues = OrderedDict()
+        # Interactive requests served in a row while background ones waited.
+        self._streak = 0
+        self._handle: asyncio.TimerHandle | None = None
+        self.requests = 0
+        self.interactive = 0
+        self.delayed = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def configure(self, rate: float, burst: int) -> None:
+        """Change the rate and burst of the bucket."""
+        self._refill()
+        self.rate = rate
+        self.burst = burst
+        self._tokens = min(self._tokens, float(burst))
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(
+            float(self.burst), self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    async def acquire(self, key: Hashable = None, interactive: bool = False) -> None:
+        """Wait until a request may be sent for key."""
+        self.requests += 1
+        if interactive:
+            self.interactive += 1
+        self._refill()
+        if not self._queues and not self._interactive and self._tokens >= 1:
+            self._tokens -= 1
+            return
+
+        started = time.monotonic()
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        queues = self._interactive if interactive else self._queues
+        queues.setdefault(key, deque()).append(future)
+        self._schedule()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The token was granted after cancellation, hand it back.
+                self._tokens += 1
+            raise
+        waited = time.monotonic() - started
+        self.delayed += 1
+        self.wait_total += waited
+        self.wait_max = max(self.wait_max, waited)
+        logger.debug("Request for %s waited %.2fs for rate limit", key, waited)
+
+    def _schedule(self) -> None:
+        if self._handle is not None or not (self._queues or self._interactive):
+            return
+        delay = max(0.0, (1 - self._tokens) / self.rate)
+        self._handle = asyncio.get_running_loop().call_later(delay, self._dispatch)
+
+    def _dispatch(self) -> None:
+        self._handle = None
+        self._refill()
+        while self._tokens >= 1 and (queues := self._next_queues()):
+            key, queue = next(iter(queues.items()))
+            future = queue.popleft()
+            if queue:
+                queues.move_to_end(key)
+            else:
+                del queues[key]
+            if future.done():
+                continue
+            self._tokens -= 1
+            future.set_result(None)
+        self._schedule()
+
+    def _next_queues(self) -> _Queues | None:
+        """Return the queues to serve next, interactive ones first."""
+        if self._interactive and (not self._queues or self._streak < BACKGROUND_EVERY):
+            if self._queues:
+                self._streak += 1
+            return self._interactive
+        self._streak = 0
+        return self._queues or None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return limiter settings and counters for diagnostics."""
+        return {
+            "rate": self.rate,
+            "burst": self.burst,
+            "requests": self.requests,
+            "interactive": self.interactive,
+            "delayed": self.delayed,
+            "wait_total": round(self.wait_total, 3),
+            "wait_max": round(self.wait_max, 3),
+            "queued": sum(
+                len(queue)
+                for queues in (self._queues, self._interactive)
+                for queue in queues.values()
+            ),
+        }
+
+
+@callback
+def async_get_rate_limiter(
+    hass: HomeAssistant,
+    account: str | None = None,
+    options: Mapping[str, Any] | None = None,
+) -> RateLimiter:
+    """Return the rate limiter of an account, applying any configured limits.
+
+    Like the clients of the ClientPool, limiters are kept per account token,
+    so entries of different accounts do not share or reconfigure one.
+    """
+    options = options or MappingProxyType({})
+    rate = options.get(REQUEST_RATE)
+    burst = options.get(REQUEST_BURST)
+    limiters: dict[str | None, RateLimiter] = hass.data.setdefault(RATE_LIMITER, {})
+    if (limiter := limiters.get(account)) is None:
+        limiter = limiters[account] = RateLimiter(
+            rate or DEFAULT_REQUEST_RATE, burst or DEFAULT_REQUEST_BURST
+        )
+    elif rate is not None or burst is not None:
+        limiter.configure(rate or limiter.rate, burst or limiter.burst)
+    return limiter
+
+
+class SingleFlight:
+    """Share one in-flight call per key between concurrent callers."""
+
+    def __init__(self) -> None:
+        self._inflight: dict[Hashable, asyncio.Future[Any]] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    async def run(self, key: Hashable, call: Callable[[], Coroutine[Any, Any, T]]) -> T:
+        """Await the call for key, joining one that is already running."""
+        self.calls += 1
+        future = self._inflight.get(key)
+        if future is not None and not future.done():
+            self.coalesced += 1
+            logger.debug("Joining in-flight call for %s", key)
+        else:
+            future = self._inflight[key] = asyncio.ensure_future(call())
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # Shield so one caller being cancelled does not cancel the others.
+        return await asyncio.shield(future)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return call counters for diagnostics."""
+        return {
+            "calls": self.calls,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._inflight),
+        }
+
+
+@callback
+def async_get_single_flight(hass: HomeAssistant) -> SingleFlight:
+    """Return the account-wide single-flight registry for device refreshes."""
+    if (single_flight := hass.data.get(SINGLE_FLIGHT)) is None:
+        single_flight = hass.data[SINGLE_FLIGHT] = SingleFlight()
+    return single_flight
+
+
+class ClientPool:
+    """Logged in clients shared by every config entry of the same account.
+
+    Entries acquire the client for their token and release it on unload; the
+    first acquire logs in and the last release closes the client.
+    """
+
+    def __init__(self) -> None:
+        self._clients: dict[str, asyncio.Future[SurePetcareClient]] = {}
+        self._users: dict[str, int] = {}
+        self.logins = 0
+
+    async def acquire(
+        self, token: str, login: Callable[[], Coroutine[Any, Any, SurePetcareClient]]
+    ) -> SurePetcareClient:
+        """Return the client for token, logging in with login on first use."""
+        self._users[token] = self._users.get(token, 0) + 1
+        if (future := self._clients.get(token)) is None:
+            self.logins += 1
+            future = self._clients[token] = asyncio.ensure_future(login())
+        try:
+            return await asyncio.shield(future)
+        except BaseException:
+            await self.release(token)
+            raise
+
+    async def release(self, token: str) -> None:
+        """Drop one user of the client for token, closing it after the last."""
+        self._users[token] -= 1
+        if self._users[token]:
+            return
+        del self._users[token]
+        future = self._clients.pop(token)
+        if not future.done():
+            future.cancel()
+        elif not future.cancelled() and future.exception() is None:
+            logger.debug("Closing client, no config entries left using it")
+            await future.result().close()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return pool counters for diagnostics."""
+        return {
+            "accounts": len(self._clients),
+            "users": sum(self._users.values()),
+            "logins": self.logins,
+        }
+
+
+@callback
+def async_get_client_pool(hass: HomeAssistant) -> ClientPool:
+    """Return the pool of clients shared between config entries."""
+    if (pool := hass.data.get(CLIENT_POOL)) is None:
+        pool = hass.data[CLIENT_POOL] = ClientPool()
+    return pool
+
+
+# Kinds of request, each with its own deadline.
+READ = "read"
+WRITE = "write"
+SETUP = "setup"
+
+
+def endpoint(command: Any) -> str:
+    """Return the endpoint of a command, for counting requests per endpoint."""
+    return str(getattr(command, "endpoint", None) or type(command).__name__)
+
+
+class RequestTimeouts:
+    """Deadlines for each kind of request, and counts of requests exceeding them."""
+
+    def __init__(self, options: Mapping[str, Any] | None = None) -> None:
+        options = options or {}
+        self.budgets = {
+            READ: options.get(TIMEOUT_READ, TIMEOUT_API),
+            WRITE: options.get(TIMEOUT_WRITE, DEFAULT_TIMEOUT_WRITE),
+            SETUP: options.get(TIMEOUT_SETUP, DEFAULT_TIMEOUT_SETUP),
+        }
+        self.timed_out: Counter[str] = Counter()
+
+    def record(self, kind: str, command: Any) -> None:
+        """Count a request that ran out of time."""
+        self.timed_out[f"{kind} {endpoint(command)}"] += 1
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the deadlines and timeout counters for diagnostics."""
+        return {**self.budgets, "timed_out": dict(self.timed_out)}
+
+
+class CommandsFailed(HomeAssistantError):
+    """Some commands of one operation failed while the others were sent."""
+
+    def __init__(self, results: list[Any], failed: list[tuple[Any, Exception]]) -> None:
+        self.results = results
+        self.failed = failed
+        super().__init__(
+            f"{len(failed)} of {len(results)} commands failed: "
+            + "; ".join(f"{command}: {err}" for command, err in failed)
+        )
+
+
+class SurePetcareApi:
+    """SurePetcareClient wrapper sending every request through the rate limiter."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        client: SurePetcareClient,
+        key: Hashable = None,
+        options: Mapping[str, Any] | None = None,
+        account: str | None = None,
+    ) -> None:
+        self.hass = hass
+        self.client = client
+        self.key = key
+        # Token the client is pooled by, whose rate limiter requests wait for.
+        self.account = account
+        self.timeouts = RequestTimeouts(options)
+
+    async def api(
+        self, command: Any, kind: str = READ, interactive: bool | None = None
+    ) -> Any:
+        """Send a command once the rate limiter allows it.
+
+        Writes, and requests marked interactive, go ahead of background
+        requests waiting for the limiter. The request is cancelled once it
+        takes longer than the deadline for its kind, raising TimeoutError. A
+        list of commands is sent in order, as a command may depend on the one
+        before it. Use api_many for commands that are independent.
+        """
+        if interactive is None:
+            interactive = kind == WRITE
+        if isinstance(command, list):
+            return [await self.api(cmd, kind, interactive) for cmd in command]
+        limiter = async_get_rate_limiter(self.hass, self.account)
+        await limiter.acquire(self.key, interactive)
+        deadline = asyncio.timeout(self.timeouts.budgets[kind])
+        try:
+            async with deadline:
+                return await self.client.api(command)
+        except TimeoutError:
+            if deadline.expired():
+                self.timeouts.record(kind, command)
+                logger.warning(
+                    "%s request to %s timed out", kind.capitalize(), endpoint(command)
+                )
+            raise
+
+    async def api_many(
+        self,
+        commands: list[Any],
+        limit: int = COMMAND_CONCURRENCY,
+        kind: str = READ,
+        interactive: bool | None = None,
+    ) -> list[Any]:
+        """Send independent commands, at most limit at a time.
+
+        Every command is sent even if others fail. If any failed, raises
+        CommandsFailed with the results of all of them, the failed ones being
+        their exceptions.
+        """
+        semaphore = asyncio.Semaphore(limit)
+
+        async def send(command: Any) -> Any:
+            async with semaphore:
+                return await self.api(command, kind, interactive)
+
+        results = await asyncio.gather(
+            *(send(command) for command in commands), return_exceptions=True
+        )
+        failed = [
+            (command, result)
+            for command, result in zip(commands, results, strict=True)
+            if isinstance(result, Exception)
+        ]
+        if failed:
+            raise CommandsFailed(results, failed)
+        return results
+
+    async def refresh(self, device: SurePetCareBase, interactive: bool = False) -> Any:
+        """Refresh a device, joining a refresh of it that is already running.
+
+        Refreshes are shared per device object, as the response updates the
+        object that sent it. Other entries may hold another object for the
+        same device, and pets and devices may share an id.
+        """
+        return await async_get_single_flight(self.hass).run(
+            id(device), lambda: self.api(device.refresh(), interactive=interactive)
+        )
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.client, name)
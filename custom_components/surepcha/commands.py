@@ -0,0 +1,239 @@
+"""Command handling for SurePetCare devices."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import OrderedDict
+from collections.abc import Callable, Coroutine, Hashable, Iterable
+from dataclasses import dataclass, field
+from itertools import count
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+
+from .const import DOMAIN
+from .method_field import merge_nested
+
+logger = logging.getLogger(__name__)
+
+type Writes = list[tuple[str, Any]]
+
+# Which of the pets and devices involved in a command have state it changes,
+# by command type. Commands not listed here change all of them.
+COMMAND_DEPENDENCIES: dict[str, frozenset[str]] = {
+    "set_control": frozenset({"device"}),
+    "set_position": frozenset({"pet"}),
+    # Flap assignments are part of both the pet and the flap.
+    "set_profile": frozenset({"pet", "device"}),
+    # The tag list of the device, and the devices of the pet.
+    "set_tag": frozenset({"pet", "device"}),
+}
+
+
+def affected_ids(command: str, **involved: Iterable[Any]) -> set[str]:
+    """Return the ids whose data a command changes.
+
+    involved maps a role ("pet", "device") to the ids in that role.
+    """
+    roles = COMMAND_DEPENDENCIES.get(command, frozenset(involved))
+    return {str(id_) for role in roles for id_ in involved.get(role, ())}
+
+
+@callback
+def async_request_refreshes(hass: HomeAssistant, ids: Iterable[str]) -> None:
+    """Refresh the coordinators of ids once commands to them have settled.
+
+    Requests for the same coordinator are coalesced by its command refresh
+    debouncer, in whichever config entry it is.
+    """
+    ids = set(ids)
+    for entry in hass.config_entries.async_loaded_entries(DOMAIN):
+        for coordinator in getattr(entry, "runtime_data", None) or []:
+            if str(coordinator._device.id) in ids:
+                hass.async_create_task(coordinator.async_request_command_refresh())
+
+
+@dataclass
+class _Command:
+    """A queued command with the futures of everyone waiting for it."""
+
+    payload: dict[str, Any] | None = None
+    call: Callable[[], Coroutine[Any, Any, Any]] | None = None
+    writes: Writes = field(default_factory=list)
+    futures: list[asyncio.Future[Any]] = field(default_factory=list)
+
+
+def _retrieve(future: asyncio.Future[Any]) -> None:
+    """Mark a failed future as seen, callers need not await their command."""
+    if not future.cancelled():
+        future.exception()
+
+
+class CommandQueue:
+    """Ordered queue of the commands for one device.
+
+    Commands are sent one at a time in the order they were queued. A write
+    still waiting in the queue is replaced by a newer write to the same
+    paths. Consecutive set_control writes are deep merged into one request,
+    after waiting delay for more of them to arrive. At most max_depth
+    commands can wait; more are rejected. Writes that fail to send are
+    passed to on_failed with the error.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        name: str,
+        delay: float,
+        max_depth: int,
+        send_control: Callable[[dict[str, Any]], Coroutine[Any, Any, Any]],
+        on_sent: Callable[[Writes], Coroutine[Any, Any, None]],
+        on_failed: Callable[[Writes, Exception], None] | None = None,
+    ) -> None:
+        self.hass = hass
+        self.entry = entry
+        self.name = name
+        self.delay = delay
+        self.max_depth = max_depth
+        self._send_control = send_control
+        self._on_sent = on_sent
+        self._on_failed = on_failed
+        self._commands: OrderedDict[Hashable, _Command] = OrderedDict()
+        self._ids = count()
+        self._worker: asyncio.Task[None] | None = None
+        self.queued = 0
+        self.superseded = 0
+        self.rejected = 0
+        self.failed = 0
+        self.max_seen = 0
+        self.payloads = 0
+        self.requests = 0
+
+    @property
+    def depth(self) -> int:
+        """Return the number of commands waiting to be sent."""
+        return len(self._commands)
+
+    @callback
+    def write(
+        self, payload: dict[str, Any], writes: Writes | None = None
+    ) -> asyncio.Future[Any]:
+        """Queue a set_control payload, optionally for the given path writes.
+
+        Returns a future for the request that sends it.
+        """
+        self.payloads += 1
+        key: Hashable = (
+            tuple(sorted(path for path, _ in writes)) if writes else next(self._ids)
+        )
+        command = _Command(payload=payload, writes=list(writes or []))
+        if (superseded := self._commands.pop(key, None)) is not None:
+            self.superseded += 1
+            command.futures = superseded.futures
+        return self._queue(key, command)
+
+    @callback
+    def call(self, call: Callable[[], Coroutine[Any, Any, Any]]) -> asyncio.Future[Any]:
+        """Queue any other command. Returns a future for its result."""
+        return self._queue(next(self._ids), _Command(call=call))
+
+    def _queue(self, key: Hashable, command: _Command) -> asyncio.Future[Any]:
+        if not command.futures and self.depth >= self.max_depth:
+            self.rejected += 1
+            raise HomeAssistantError(
+                f"Too many commands waiting for {self.name}, try again later"
+            )
+        future: asyncio.Future[Any] = self.hass.loop.create_future()
+        future.add_done_callback(_retrieve)
+        command.futures.append(future)
+        self._commands[key] = command
+        self.queued += 1
+        self.max_seen = max(self.max_seen, self.depth)
+        if self._worker is None:
+            self._worker = self.entry.async_create_task(
+                self.hass,
+                self._run(),
+                f"surepcha commands {self.name}",
+                eager_start=False,
+            )
+        return future
+
+    def _pop_next(self) -> tuple[dict[str, Any] | None, _Command]:
+        """Pop the next command, merging consecutive writes into the first."""
+        _, command = self._commands.popitem(last=False)
+        if command.payload is None:
+            return None, command
+        payload = command.payload
+        while self._commands:
+            key, queued = next(iter(self._commands.items()))
+            if queued.payload is None:
+                break
+            del self._commands[key]
+            payload = merge_nested(payload, queued.payload)
+            command.writes.extend(queued.writes)
+            command.futures.extend(queued.futures)
+        return payload, command
+
+    async def _run(self) -> None:
+        try:
+            while self._commands:
+                if next(iter(self._commands.values())).payload is not None:
+                    # Give writes that belong together time to arrive.
+                    await asyncio.sleep(self.delay)
+                payload, command = self._pop_next()
+                try:
+                    if payload is not None:
+                        self.requests += 1
+                        logger.debug("Sending control to %s: %s", self.name, payload)
+                        result = await self._send_control(payload)
+                    else:
+                        # Only commands queued by call have no payload.
+                        assert command.call is not None
+                        result = await command.call()
+                except asyncio.CancelledError:
+                    # Shut down while sending, its callers must not wait forever.
+                    for future in command.futures:
+                        future.cancel()
+                    raise
+                except Exception as err:  # noqa: BLE001 - reported to the callers
+                    self.failed += 1
+                    logger.warning("Command to %s failed: %s", self.name, err)
+                    for future in command.futures:
+                        if not future.done():
+                            future.set_exception(err)
+                    if self._on_failed is not None and command.writes:
+                        self._on_failed(command.writes, err)
+                    continue
+                for future in command.futures:
+                    if not future.done():
+                        future.set_result(result)
+                await self._on_sent(command.writes)
+        finally:
+            self._worker = None
+
+    @callback
+    def async_shutdown(self) -> None:
+        """Cancel the queued commands and the one being sent."""
+        if self._worker is not None:
+            self._worker.cancel()
+        for command in self._commands.values():
+            for future in command.futures:
+                future.cancel()
+        self._commands.clear()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return queue counters for diagnostics."""
+        return {
+            "control_payloads": self.payloads,
+            "control_requests": self.requests,
+            "queue_depth": self.depth,
+            "queue_max_depth": self.max_seen,
+            "queued": self.queued,
+            "superseded": self.superseded,
+            "rejected": self.rejected,
+            "failed": self.failed,
+        }
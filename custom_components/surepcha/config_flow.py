@@ -14,6 +14,7 @@ from homeassistant.helpers.device_registry import callback
 from surepcio import Household, SurePetcareClient
 from surepcio.enums import ProductId
 
+from .api import SETUP, SurePetcareApi
 from .const import (
     CLIENT_DEVICE_ID,
     DOMAIN,
@@ -29,6 +30,7 @@ from .device_config_schema import (
     DEVICE_CONFIG_SCHEMAS,
     MANUAL_PROPERTIES,
     OPTION_CONFIG_SCHEMAS,
+    SETTINGS_SCHEMAS,
 )
 
 logger = logging.getLogger(__name__)
@@ -120,10 +122,12 @@ class SurePetCareConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):  # type:
         )
 
     async def _fetch_all_household_data(
-        self, client: SurePetcareClient
+        self, client: SurePetcareApi
     ) -> list[tuple[Household, dict]]:
         """Return (household, entity_info) pairs for all households."""
-        households: list[Household] = await client.api(Household.get_households())
+        households: list[Household] = await client.api(
+            Household.get_households(), SETUP
+        )
         result = []
         for household in households:
             entity_info, _ = await self._async_fetch_entities_for_household(
@@ -133,10 +137,12 @@ class SurePetCareConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):  # type:
         return result
 
     async def _fetch_entity_info_for_id(
-        self, client: SurePetcareClient, household_id: int
+        self, client: SurePetcareApi, household_id: int
     ) -> dict | None:
         """Fetch entity info for the household matching household_id."""
-        households: list[Household] = await client.api(Household.get_households())
+        households: list[Household] = await client.api(
+            Household.get_households(), SETUP
+        )
         household = next((h for h in households if h.id == household_id), None)
         if household is None:
             return None
@@ -186,7 +192,7 @@ class SurePetCareConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):  # type:
         return household.data.get("name") or f"SurePetCare {household.id}"
 
     async def _async_fetch_entities_for_household(
-        self, client: SurePetcareClient, household: Household
+        self, client: SurePetcareApi, household: Household
     ):
         """Fetch devices/pets for a single household, return (entity_info, error)."""
         errors: dict[str, str] = {}
@@ -194,13 +200,13 @@ class SurePetCareConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):  # type:
         _devices.update(
             {
                 str(device.id): device
-                for device in await client.api(household.get_devices())
+                for device in await client.api(household.get_devices(), SETUP)
             }
         )
         _devices.update(
             {
                 str(device.id): device
-                for device in await client.api(household.get_pets())
+                for device in await client.api(household.get_pets(), SETUP)
             }
         )
         if not _devices:
@@ -236,6 +242,7 @@ class SurePetCareConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):  # type:
             self.hass.config_entries.async_update_entry(
                 entry,
                 options={
+                    **entry.options,
                     OPTION_DEVICES: entity_info,
                     OPTION_PROPERTIES: option_properties,
                 },
@@ -253,6 +260,7 @@ class SurePetCareConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):  # type:
                     title=self._household_title(first_household),
                     data={**entry.data, HOUSEHOLD_ID: first_household.id},
                     options={
+                        **entry.options,
                         OPTION_DEVICES: first_entity_info,
                         OPTION_PROPERTIES: option_properties,
                     },
@@ -263,9 +271,9 @@ class SurePetCareConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):  # type:
 
     async def _authenticate(
         self, email=None, password=None, token=None, device_id=None
-    ) -> tuple[SurePetcareClient, dict]:
+    ) -> tuple[SurePetcareApi, dict]:
         errors = {}
-        client = SurePetcareClient()
+        client = SurePetcareApi(self.hass, SurePetcareClient())
         logged_in = await client.login(
             email=email, password=password, token=token, device_id=device_id
         )
@@ -276,6 +284,9 @@ class SurePetCareConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):  # type:
         token = getattr(client, TOKEN, None)
         if not token:
             errors["base"] = "cannot_connect"
+        else:
+            # Count the flow's requests against the account's rate limit.
+            client.account = token
 
         return client, errors
 
@@ -332,7 +343,7 @@ class SurePetCareOptionsFlow(config_entries.OptionsFlowWithReload):
 
         return self.async_show_menu(
             step_id="init",
-            menu_options=["manual_properties", "devices"],
+            menu_options=["manual_properties", "devices", "settings"],
         )
 
     async def async_step_manual_properties(
@@ -389,6 +400,28 @@ class SurePetCareOptionsFlow(config_entries.OptionsFlowWithReload):
             data_schema=vol.Schema(schema_dict),
         )
 
+    async def async_step_settings(self, user_input: dict[str, Any] | None = None):
+        """Configure polling, request and command settings of the entry."""
+
+        if user_input is not None:
+            for section_key in SETTINGS_SCHEMAS:
+                self._options.update(user_input.get(section_key, {}))
+            return self.async_create_entry(title="", data=self._options)
+
+        schema_dict = {}
+        for section_key, settings_schema in SETTINGS_SCHEMAS.items():
+            section_schema, section_defaults = _build_schema_and_defaults(
+                settings_schema, self._options
+            )
+            schema_dict[vol.Optional(section_key, default=section_defaults)] = section(
+                vol.Schema(section_schema), {"collapsed": True}
+            )
+
+        return self.async_show_form(
+            step_id="settings",
+            data_schema=vol.Schema(schema_dict),
+        )
+
 
 def _build_schema_and_defaults(
     schema_info: dict[Any, Any] | None, values: dict[str, Any]
@@ -11,6 +11,12 @@ TOKEN = "token"
 CLIENT_DEVICE_ID = "client_device_id"
 FACTORY = f"{DOMAIN}_factory"
 TIMEOUT_API = 10
+TIMEOUT_READ = "timeout_read"
+TIMEOUT_WRITE = "timeout_write"
+TIMEOUT_SETUP = "timeout_setup"
+# Covers the library waiting up to 30s for /control/async and its refresh after.
+DEFAULT_TIMEOUT_WRITE = 60
+DEFAULT_TIMEOUT_SETUP = 30
 KEY_API = f"{DOMAIN}_api"
 COORDINATOR_LIST = "coordinator_list"
 COORDINATOR_DICT = "coordinator_dict"
@@ -18,6 +24,37 @@ COORDINATOR = "coordinator"
 ENTRY_ID = "entry_id"
 SCAN_INTERVAL = 300
 POLLING_SPEED = "polling_speed"
+HOUSEHOLD_POLLING = "household_polling"
+HOUSEHOLD_SCAN_INTERVAL = "household_scan_interval"
+RATE_LIMITER = f"{DOMAIN}_rate_limiter"
+SINGLE_FLIGHT = f"{DOMAIN}_single_flight"
+CLIENT_POOL = f"{DOMAIN}_client_pool"
+MERGED_OPTIONS = f"{DOMAIN}_merged_options"
+REQUEST_RATE = "request_rate"
+REQUEST_BURST = "request_burst"
+DEFAULT_REQUEST_RATE = 2.0
+DEFAULT_REQUEST_BURST = 20
+STARTUP_REFRESH_CONCURRENCY = 4
+COMMAND_CONCURRENCY = 4
+ADAPTIVE_POLLING = "adaptive_polling"
+ADAPTIVE_MIN_INTERVAL = "adaptive_min_interval"
+ADAPTIVE_MAX_INTERVAL = "adaptive_max_interval"
+DEFAULT_ADAPTIVE_MIN_INTERVAL = 30
+DEFAULT_ADAPTIVE_MAX_INTERVAL = 1800
+SNAPSHOT_CACHE = "snapshot_cache"
+BACKGROUND_SETUP = "background_setup"
+COMMAND_REFRESH_DELAY = "command_refresh_delay"
+DEFAULT_COMMAND_REFRESH_DELAY = 3.0
+OPTIMISTIC_UPDATES = "optimistic_updates"
+CONTROL_BATCH_DELAY = "control_batch_delay"
+DEFAULT_CONTROL_BATCH_DELAY = 0.3
+COMMAND_QUEUE_DEPTH = "command_queue_depth"
+DEFAULT_COMMAND_QUEUE_DEPTH = 20
+NUMBER_DEBOUNCE = "number_debounce"
+DEFAULT_NUMBER_DEBOUNCE = 0.0
+OFFLINE_QUEUE = "offline_queue"
+OFFLINE_QUEUE_TTL = "offline_queue_ttl"
+DEFAULT_OFFLINE_QUEUE_TTL = 3600
 LOCATION_INSIDE = "location_inside"
 LOCATION_OUTSIDE = "location_outside"
 OPTION_DEVICES = "devices"
@@ -30,6 +67,7 @@ DEVICES = "devices"
 NAME = "name"
 MANUAL_PROPERTIES = "manual_properties"
 HOUSEHOLD_ID = "household_id"
+ATTR_CACHED_AT = "cached_at"
 
 FLAP_PRODUCTS = {
     ProductId.PET_DOOR,
@@ -1,14 +1,51 @@
+import asyncio
 import logging
-from datetime import timedelta
+from collections.abc import Callable, Hashable
+from datetime import datetime, timedelta
+from types import MappingProxyType
 from typing import Any, TypeVar
 
+from aiohttp import ClientError
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
-from surepcio import SurePetcareClient
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 from surepcio.devices.device import SurePetCareBase
 
-from .const import OPTION_DEVICES, POLLING_SPEED, SCAN_INTERVAL
+from .api import WRITE, SurePetcareApi
+from .commands import CommandQueue
+from .const import (
+    ADAPTIVE_MAX_INTERVAL,
+    ADAPTIVE_MIN_INTERVAL,
+    ADAPTIVE_POLLING,
+    COMMAND_QUEUE_DEPTH,
+    COMMAND_REFRESH_DELAY,
+    CONTROL_BATCH_DELAY,
+    DEFAULT_ADAPTIVE_MAX_INTERVAL,
+    DEFAULT_ADAPTIVE_MIN_INTERVAL,
+    DEFAULT_COMMAND_QUEUE_DEPTH,
+    DEFAULT_COMMAND_REFRESH_DELAY,
+    DEFAULT_CONTROL_BATCH_DELAY,
+    DOMAIN,
+    HOUSEHOLD_POLLING,
+    HOUSEHOLD_SCAN_INTERVAL,
+    OPTIMISTIC_UPDATES,
+    OPTION_DEVICES,
+    POLLING_SPEED,
+    SCAN_INTERVAL,
+)
+from .helper import fingerprint
+from .method_field import (
+    FieldContext,
+    FieldValues,
+    MethodField,
+    build_payload,
+    get_by_path,
+    set_by_path,
+)
+from .offline import OfflineCommandStore, replay_delay
+from .options import async_get_merged_options
+from .polling import AdaptiveInterval, CircuitBreaker, next_poll_delay
 
 logger = logging.getLogger(__name__)
 
@@ -17,10 +54,33 @@ type SurePetcareConfigEntry = ConfigEntry[
     list["SurePetCareDeviceDataUpdateCoordinator"]
 ]
 T = TypeVar("T", bound=SurePetCareBase)
+D = TypeVar("D")
 
 
-class SurePetCareDeviceDataUpdateCoordinator(DataUpdateCoordinator[T]):
-    """Coordinator to manage data for a specific SurePetCare device."""
+def device_polling_speed(
+    entry_options: MappingProxyType[str, Any], device_id: int
+) -> int:
+    """Return the configured polling speed in seconds for a device."""
+    return (
+        entry_options.get(OPTION_DEVICES, {})
+        .get(str(device_id), {})
+        .get(POLLING_SPEED, SCAN_INTERVAL)
+    )
+
+
+def household_polling_interval(entry_options: MappingProxyType[str, Any]) -> int | None:
+    """Return the household poll interval, or None if household polling is off."""
+    if not entry_options.get(HOUSEHOLD_POLLING, False):
+        return None
+    return entry_options.get(HOUSEHOLD_SCAN_INTERVAL, SCAN_INTERVAL)
+
+
+class SurePetCareDataUpdateCoordinator(DataUpdateCoordinator[D]):
+    """Base coordinator polling on a fixed phase within its interval.
+
+    Coordinators created together would otherwise poll at the same moment
+    forever, so each one is given a phase and refreshes are scheduled on it.
+    """
 
     config_entry: SurePetcareConfigEntry
 
@@ -28,34 +88,529 @@ class SurePetCareDeviceDataUpdateCoordinator(DataUpdateCoordinator[T]):
         self,
         hass: HomeAssistant,
         entry: SurePetcareConfigEntry,
-        client: SurePetcareClient,
-        device: SurePetCareBase,
+        name: str,
+        update_interval: timedelta | None,
+        phase: float = 0.0,
     ) -> None:
-        """Initialize device coordinator."""
+        """Initialize coordinator."""
         super().__init__(
             hass,
             logger,
             config_entry=entry,
-            name=f"{device.name}",
-            update_interval=timedelta(
-                seconds=entry.options.get(OPTION_DEVICES, {})
-                .get(str(device.id), {})
-                .get(POLLING_SPEED, SCAN_INTERVAL)
-            ),
+            name=name,
+            update_interval=update_interval,
+        )
+        self.poll_interval = (
+            update_interval.total_seconds() if update_interval is not None else None
         )
+        self.phase = phase
+
+    def polling_diagnostics(self) -> dict[str, Any]:
+        """Return the poll schedule for diagnostics."""
+        return {"interval": self.poll_interval, "phase": round(self.phase, 3)}
+
+    def _poll_delay(self, now: float) -> float | None:
+        """Return seconds until the next poll, or None if not polling."""
+        if self.poll_interval is None:
+            return None
+        return next_poll_delay(now, self.poll_interval, self.phase)
+
+    @callback
+    def _schedule_refresh(self) -> None:
+        """Schedule the next refresh on this coordinator's poll phase."""
+        if (delay := self._poll_delay(self.hass.loop.time())) is not None:
+            self.update_interval = timedelta(seconds=delay)
+        super()._schedule_refresh()
+
+
+class SurePetCareDeviceDataUpdateCoordinator(SurePetCareDataUpdateCoordinator[T]):
+    """Coordinator to manage data for a specific SurePetCare device."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: SurePetcareConfigEntry,
+        client: SurePetcareApi,
+        device: SurePetCareBase,
+        phase: float = 0.0,
+        offline: OfflineCommandStore | None = None,
+    ) -> None:
+        """Initialize device coordinator.
+
+        When household polling is enabled the household coordinator pushes data
+        to this coordinator, so it only keeps its own timer if the device asks to
+        be polled more often than the household.
+        """
+        polling_speed = device_polling_speed(entry.options, device.id)
+        household_interval = household_polling_interval(entry.options)
+        if household_interval is not None and polling_speed >= household_interval:
+            update_interval = None
+        else:
+            update_interval = timedelta(seconds=polling_speed)
+
+        super().__init__(hass, entry, f"{device.name}", update_interval, phase=phase)
         self._device = device
         self.product_id = self._device.product_id
         self.client = client
         self._exception: Exception | None = None
+        self.breaker = CircuitBreaker(polling_speed)
+        # Commands often come in bursts, refresh once for those sent within
+        # the cooldown after the first of them.
+        self._command_refresh = Debouncer(
+            hass,
+            logger,
+            cooldown=entry.options.get(
+                COMMAND_REFRESH_DELAY, DEFAULT_COMMAND_REFRESH_DELAY
+            ),
+            immediate=False,
+            function=self._async_command_refresh,
+        )
+        self.command_refresh_requests = 0
+        self.command_refreshes = 0
+        # Called once the next refresh after a command is done.
+        self._command_refreshed: list[Callable[[], None]] = []
+        self.commands = CommandQueue(
+            hass,
+            entry,
+            self.name,
+            entry.options.get(CONTROL_BATCH_DELAY, DEFAULT_CONTROL_BATCH_DELAY),
+            entry.options.get(COMMAND_QUEUE_DEPTH, DEFAULT_COMMAND_QUEUE_DEPTH),
+            self._async_send_control,
+            self._async_command_sent,
+            self._async_command_failed,
+        )
+        # Writes that failed are replayed from here once the cloud is back.
+        self.offline = offline
+        self._replay: asyncio.Task[None] | None = None
+        self._replay_attempts = 0
+        self._replay_at = 0.0
+        self.optimistic = entry.options.get(OPTIMISTIC_UPDATES, False)
+        # Values written by commands, shown until the next refresh.
+        self._optimistic: dict[str, Any] = {}
+        # Values last sent to the cloud for those paths, restored if a
+        # command writing one of them fails.
+        self._optimistic_base: dict[str, Any] = {}
+        self.optimistic_rollbacks = 0
+        self.adaptive: AdaptiveInterval | None = None
+        if update_interval is not None and entry.options.get(ADAPTIVE_POLLING, False):
+            self.adaptive = AdaptiveInterval(
+                polling_speed,
+                entry.options.get(ADAPTIVE_MIN_INTERVAL, DEFAULT_ADAPTIVE_MIN_INTERVAL),
+                entry.options.get(ADAPTIVE_MAX_INTERVAL, DEFAULT_ADAPTIVE_MAX_INTERVAL),
+            )
+            self.poll_interval = self.adaptive.interval
+        self._notified: tuple[bool, bool, int] | None = None
+        # Shared by the entities of the device, rebuilt on every update.
+        self._field_context: FieldContext | None = None
+        self._generation = 0
+        # Fields of the device's entities and their values for the context.
+        self._fields: dict[Hashable, MethodField] = {}
+        self._field_values: dict[Hashable, FieldValues] = {}
+        # When the data was cached, while it still comes from the snapshot.
+        self.cached_at: datetime | None = None
 
     async def _async_setup(self):
         """Fetch initial data for the device."""
-        await self.client.api(self._device.refresh())
+        await self.async_fetch()
 
-    async def _async_update_data(self) -> Any:
+    async def _async_update_data(self, interactive: bool = False) -> Any:
         """Fetch data from the api for a specific device."""
         logger.debug(
             "Fetching data for device %s (id=%s)", self._device.name, self._device.id
         )
-        await self.client.api(self._device.refresh())
+        await self.async_fetch(interactive)
+        self.cached_at = None
+        if self.adaptive is not None:
+            self.poll_interval = self.adaptive.update(
+                fingerprint(self._device), self.hass.loop.time()
+            )
         return self._device
+
+    async def async_fetch(self, interactive: bool = False) -> None:
+        """Refresh the device, unless its circuit breaker is open.
+
+        An interactive refresh, such as after a command, goes ahead of polls.
+        """
+        now = self.hass.loop.time()
+        if not self.breaker.allow(now):
+            raise UpdateFailed(
+                f"Skipping refresh of {self.name} after "
+                f"{self.breaker.failures} failed refreshes"
+            )
+        try:
+            await self.client.refresh(self._device, interactive)
+        except BaseException:
+            # Also on cancellation, so a probe never leaves the breaker half-open.
+            self.breaker.record_failure(now)
+            raise
+        self.breaker.record_success()
+        self._reconcile_optimistic()
+        self._async_schedule_replay()
+
+    @callback
+    def async_apply_optimistic(
+        self,
+        writes: list[tuple[str, Any]],
+        sent: asyncio.Future[Any] | None = None,
+    ) -> None:
+        """Show values written by a command before the cloud reports them.
+
+        If sending the command fails, the last value sent to the cloud is
+        restored, unless a refresh or a later command replaced it meanwhile.
+        """
+        for path, value in writes:
+            if path not in self._optimistic_base:
+                self._optimistic_base[path] = get_by_path(self._device, path)
+            if set_by_path(self._device, path, value):
+                self._optimistic[path] = value
+        self.async_update_listeners()
+        if sent is None:
+            return
+
+        def settle(done: asyncio.Future[Any]) -> None:
+            failed = done.cancelled() or done.exception() is not None
+            for path, written in writes:
+                if path not in self._optimistic_base:
+                    continue  # Replaced by a refresh.
+                if not failed:
+                    self._optimistic_base[path] = written
+                elif path in self._optimistic and self._optimistic[path] is written:
+                    del self._optimistic[path]
+                    set_by_path(self._device, path, self._optimistic_base.pop(path))
+                    self.optimistic_rollbacks += 1
+            if failed:
+                self.async_update_listeners()
+
+        sent.add_done_callback(settle)
+
+    def _reconcile_optimistic(self) -> None:
+        """Let refreshed data replace optimistic values, counting rollbacks."""
+        for path, written in self._optimistic.items():
+            if (value := get_by_path(self._device, path)) != written:
+                self.optimistic_rollbacks += 1
+                logger.debug(
+                    "%s: %s is %s in the cloud, not %s", self.name, path, value, written
+                )
+        self._optimistic.clear()
+        self._optimistic_base.clear()
+
+    async def async_set_control(self, payload: dict[str, Any]) -> Any:
+        """Queue a set_control payload and wait until it has been sent."""
+        return await self.commands.write(payload)
+
+    async def _async_send_control(self, payload: dict[str, Any]) -> Any:
+        return await self.client.api(self._device.set_control(**payload), WRITE)
+
+    async def _async_command_sent(self, writes: list[tuple[str, Any]]) -> None:
+        if self.offline is not None and writes:
+            self.offline.remove(self._device.id, [path for path, _ in writes])
+        # update entities with new data
+        await self.async_request_command_refresh()
+
+    @callback
+    def _async_command_failed(
+        self, writes: list[tuple[str, Any]], err: Exception
+    ) -> None:
+        # Only keep writes the cloud never got; others would fail again.
+        if self.offline is not None and isinstance(err, (ClientError, TimeoutError)):
+            self.offline.add(self._device.id, writes)
+
+    @callback
+    def _async_schedule_replay(self) -> None:
+        """Replay writes that failed before, now that the device is reachable."""
+        if (
+            self.offline is None
+            or self._replay is not None
+            or self.hass.loop.time() < self._replay_at
+            or not self.offline.pending(self._device.id)
+        ):
+            return
+        self._replay = self.config_entry.async_create_background_task(
+            self.hass, self.async_replay_offline(), f"{DOMAIN} replay {self.name}"
+        )
+
+    async def async_replay_offline(self) -> None:
+        """Send the writes kept while the device was unreachable, in order.
+
+        After a failed replay the next one waits for a backoff that doubles
+        with every further failure.
+        """
+        if self.offline is None:
+            return
+        writes = self.offline.pending(self._device.id)
+        try:
+            if writes:
+                logger.info("Replaying %s queued writes to %s", len(writes), self.name)
+                await self.commands.write(build_payload(writes), writes)
+        except Exception as err:  # noqa: BLE001 - the writes stay queued
+            self._replay_attempts += 1
+            delay = replay_delay(self._replay_attempts)
+            self._replay_at = self.hass.loop.time() + delay
+            logger.warning(
+                "Replaying writes to %s failed, retrying in %ss: %s",
+                self.name,
+                delay,
+                err,
+            )
+        else:
+            self._replay_attempts = 0
+        finally:
+            self._replay = None
+
+    async def async_request_command_refresh(self) -> None:
+        """Refresh a short while after a command, once for all sent meanwhile.
+
+        The delay runs from the first request; later requests during it do not
+        restart it, so a steady stream of commands still refreshes regularly.
+        """
+        self.command_refresh_requests += 1
+        await self._command_refresh.async_call()
+
+    @callback
+    def async_on_command_refresh(self, done: Callable[[], None]) -> None:
+        """Call done once the next refresh after a command has finished.
+
+        Unlike listeners it is called even if the data did not change.
+        """
+        self._command_refreshed.append(done)
+
+    async def _async_command_refresh(self) -> None:
+        self.command_refreshes += 1
+        # Fetched here rather than by async_refresh, which cannot tell this
+        # refresh apart from a poll running at the same time.
+        try:
+            data = await self._async_update_data(interactive=True)
+        except Exception as err:  # noqa: BLE001 - reported like a failed poll
+            self.async_set_update_error(err)
+        else:
+            self.async_set_updated_data(data)
+        finally:
+            callbacks, self._command_refreshed = self._command_refreshed, []
+            for done in callbacks:
+                done()
+
+    async def async_shutdown(self) -> None:
+        """Cancel pending commands and command refreshes when the entry unloads."""
+        await super().async_shutdown()
+        self._command_refresh.async_shutdown()
+        self.commands.async_shutdown()
+
+    def _poll_delay(self, now: float) -> float | None:
+        """Return seconds until the next poll, or until the breaker's probe."""
+        if self.poll_interval is None:
+            return None
+        if (retry_in := self.breaker.retry_in(now)) is not None:
+            return retry_in
+        return super()._poll_delay(now)
+
+    @callback
+    def async_restore(self, cached_at: datetime | None) -> None:
+        """Use the device as restored from the snapshot until it is refreshed."""
+        self.data = self._device
+        self.cached_at = cached_at
+
+    @callback
+    def async_set_pending(self) -> None:
+        """Keep the device unavailable until its first refresh succeeds."""
+        self.data = self._device
+        self.last_update_success = False
+
+    @callback
+    def async_set_updated_data(self, data: T) -> None:
+        """Accept data refreshed elsewhere, such as by the household coordinator."""
+        self.cached_at = None
+        super().async_set_updated_data(data)
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Notify listeners only if the device data or availability changed.
+
+        The device object is refreshed in place, so every poll would otherwise
+        update every entity of the device even when nothing changed.
+        """
+        notified = (
+            self.last_update_success,
+            self.cached_at is not None,
+            fingerprint(self.data),
+        )
+        if notified == self._notified:
+            logger.debug("No changes for %s, skipping listener update", self.name)
+            return
+        self._notified = notified
+        self._field_context = None
+        if self.data is not None:
+            self._async_evaluate_fields()
+        super().async_update_listeners()
+
+    @callback
+    def async_register_field(
+        self, key: Hashable, field: MethodField
+    ) -> Callable[[], None]:
+        """Evaluate field with the device's other fields on every update."""
+        self._fields[key] = field
+
+        @callback
+        def remove() -> None:
+            self._fields.pop(key, None)
+            self._field_values.pop(key, None)
+
+        return remove
+
+    @callback
+    def _async_evaluate_fields(self) -> None:
+        """Evaluate every registered field in one pass for the new data."""
+        context = self.field_context
+        self._field_values = {
+            key: FieldValues(field, context) for key, field in self._fields.items()
+        }
+
+    def field_values(self, key: Hashable, field: MethodField) -> FieldValues:
+        """Return the values of a field for the current data.
+
+        Fields are evaluated when the data changes, this only evaluates a field
+        read before that, such as by an entity that was not yet added.
+        """
+        context = self.field_context
+        if (values := self._field_values.get(key)) is None:
+            values = self._field_values[key] = FieldValues(field, context)
+        return values
+
+    @property
+    def field_context(self) -> FieldContext:
+        """Return the context the entities of the device read their values with.
+
+        It is built once per update and shared, so it must only be read from.
+        Commands collect their writes in a context of their own.
+        """
+        options = async_get_merged_options(self.hass).get(self.config_entry)
+        context = self._field_context
+        if (
+            context is None
+            or context.device is not self.data
+            or context.options is not options
+        ):
+            context = self._field_context = FieldContext(self.data, options)
+            self._generation += 1
+            self._field_values = {}
+        return context
+
+    @property
+    def generation(self) -> int:
+        """Return a number bumped whenever the field context is rebuilt.
+
+        Values entities derive from their fields can be cached until it changes.
+        """
+        _ = self.field_context
+        return self._generation
+
+    def polling_diagnostics(self) -> dict[str, Any]:
+        """Return the poll schedule, including adaptive state, for diagnostics."""
+        return {
+            **super().polling_diagnostics(),
+            "adaptive": self.adaptive.as_dict() if self.adaptive else None,
+            "breaker": self.breaker.as_dict(self.hass.loop.time()),
+        }
+
+    def command_diagnostics(self) -> dict[str, Any]:
+        """Return command handling counters for diagnostics."""
+        return {
+            **self.commands.as_dict(),
+            "refresh_requests": self.command_refresh_requests,
+            "refreshes": self.command_refreshes,
+            "refreshes_saved": self.command_refresh_requests - self.command_refreshes,
+            "offline_pending": (
+                len(self.offline.pending(self._device.id))
+                if self.offline is not None
+                else None
+            ),
+            "optimistic_pending": len(self._optimistic),
+            "optimistic_rollbacks": self.optimistic_rollbacks,
+        }
+
+    def cache_diagnostics(self) -> dict[str, Any]:
+        """Return the value cache counters of the registered entities, summed."""
+        keys = self._fields.keys()
+        return {
+            "hits": sum(getattr(key, "cache_hits", 0) for key in keys),
+            "misses": sum(getattr(key, "cache_misses", 0) for key in keys),
+        }
+
+
+class SurePetCareHouseholdDataUpdateCoordinator(
+    SurePetCareDataUpdateCoordinator[dict[int, SurePetCareBase]]
+):
+    """Coordinator refreshing every device and pet of a household in one cycle.
+
+    Each device's slice is handed to its device coordinator, so entities keep
+    listening to the same coordinator as without household polling.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: SurePetcareConfigEntry,
+        client: SurePetcareApi,
+        coordinators: list[SurePetCareDeviceDataUpdateCoordinator],
+        interval: int,
+        phase: float = 0.0,
+    ) -> None:
+        """Initialize household coordinator."""
+        super().__init__(
+            hass,
+            entry,
+            f"{entry.title} household",
+            timedelta(seconds=interval),
+            phase=phase,
+        )
+        self.client = client
+        self.coordinators = coordinators
+        # Set while setup waits for the first refresh, see below.
+        self._require_every_device = False
+
+    async def async_config_entry_first_refresh(self) -> None:
+        """Refresh while setup waits, failing it if any device fails.
+
+        This matches the per-device first refresh without household polling.
+        A refresh in the background hands out what it got instead, so one
+        failing device does not keep the others unavailable.
+        """
+        self._require_every_device = True
+        try:
+            await super().async_config_entry_first_refresh()
+        finally:
+            self._require_every_device = False
+
+    async def _async_update_data(self) -> dict[int, SurePetCareBase]:
+        """Refresh all devices of the household concurrently."""
+        logger.debug(
+            "Fetching data for %s devices in %s", len(self.coordinators), self.name
+        )
+        results = await asyncio.gather(
+            *(coordinator.async_fetch() for coordinator in self.coordinators),
+            return_exceptions=True,
+        )
+        data: dict[int, SurePetCareBase] = {}
+        for coordinator, result in zip(self.coordinators, results, strict=True):
+            if isinstance(result, Exception):
+                logger.debug(
+                    "Household refresh failed for %s: %s", coordinator.name, result
+                )
+                if self._require_every_device:
+                    raise UpdateFailed(
+                        f"Initial refresh failed for {coordinator.name}"
+                    ) from result
+                coordinator.async_set_update_error(result)
+                continue
+            data[coordinator._device.id] = coordinator._device
+        if self.coordinators and not data:
+            raise UpdateFailed(f"Refresh failed for every device in {self.name}")
+        return data
+
+    @callback
+    def async_update_devices(self) -> None:
+        """Hand each device its refreshed slice of the household data."""
+        if not self.last_update_success:
+            return
+        for coordinator in self.coordinators:
+            if (device := self.data.get(coordinator._device.id)) is not None:
+                coordinator.async_set_updated_data(device)
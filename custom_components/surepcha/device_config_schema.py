@@ -5,14 +5,45 @@ from typing import Any
 from homeassistant.data_entry_flow import section
 from homeassistant.helpers.selector import AreaSelector
 from surepcio.enums import ProductId
-from voluptuous import All, Optional, Range, Schema
+from voluptuous import All, Coerce, Optional, Range, Schema
 
 from custom_components.surepcha.const import (
+    ADAPTIVE_MAX_INTERVAL,
+    ADAPTIVE_MIN_INTERVAL,
+    ADAPTIVE_POLLING,
+    BACKGROUND_SETUP,
+    COMMAND_QUEUE_DEPTH,
+    COMMAND_REFRESH_DELAY,
+    CONTROL_BATCH_DELAY,
+    DEFAULT_ADAPTIVE_MAX_INTERVAL,
+    DEFAULT_ADAPTIVE_MIN_INTERVAL,
+    DEFAULT_COMMAND_QUEUE_DEPTH,
+    DEFAULT_COMMAND_REFRESH_DELAY,
+    DEFAULT_CONTROL_BATCH_DELAY,
+    DEFAULT_NUMBER_DEBOUNCE,
+    DEFAULT_OFFLINE_QUEUE_TTL,
+    DEFAULT_REQUEST_BURST,
+    DEFAULT_REQUEST_RATE,
+    DEFAULT_TIMEOUT_SETUP,
+    DEFAULT_TIMEOUT_WRITE,
+    HOUSEHOLD_POLLING,
+    HOUSEHOLD_SCAN_INTERVAL,
     LOCATION_INSIDE,
     LOCATION_OUTSIDE,
     MANUAL_PROPERTIES,
+    NUMBER_DEBOUNCE,
+    OFFLINE_QUEUE,
+    OFFLINE_QUEUE_TTL,
+    OPTIMISTIC_UPDATES,
     POLLING_SPEED,
+    REQUEST_BURST,
+    REQUEST_RATE,
     SCAN_INTERVAL,
+    SNAPSHOT_CACHE,
+    TIMEOUT_API,
+    TIMEOUT_READ,
+    TIMEOUT_SETUP,
+    TIMEOUT_WRITE,
 )
 
 area_fields = {
@@ -34,3 +65,47 @@ for pid in ProductId:
     schema[Optional(POLLING_SPEED, default=SCAN_INTERVAL)] = All(
         int, Range(min=5, max=86400)
     )
+
+
+INTERVAL = All(Coerce(int), Range(min=5, max=86400))
+DELAY = All(Coerce(float), Range(min=0, max=60))
+TIMEOUT = All(Coerce(float), Range(min=1, max=300))
+SIZE = All(Coerce(int), Range(min=1, max=1000))
+
+# Entry wide settings, stored at the top level of the options and grouped
+# into sections of the settings form.
+SETTINGS_SCHEMAS: dict[str, dict[Any, Any]] = {
+    "polling": {
+        Optional(HOUSEHOLD_POLLING, default=False): bool,
+        Optional(HOUSEHOLD_SCAN_INTERVAL, default=SCAN_INTERVAL): INTERVAL,
+        Optional(ADAPTIVE_POLLING, default=False): bool,
+        Optional(
+            ADAPTIVE_MIN_INTERVAL, default=DEFAULT_ADAPTIVE_MIN_INTERVAL
+        ): INTERVAL,
+        Optional(
+            ADAPTIVE_MAX_INTERVAL, default=DEFAULT_ADAPTIVE_MAX_INTERVAL
+        ): INTERVAL,
+        Optional(SNAPSHOT_CACHE, default=True): bool,
+        Optional(BACKGROUND_SETUP, default=False): bool,
+    },
+    "requests": {
+        Optional(REQUEST_RATE, default=DEFAULT_REQUEST_RATE): All(
+            Coerce(float), Range(min=0.1, max=100)
+        ),
+        Optional(REQUEST_BURST, default=DEFAULT_REQUEST_BURST): SIZE,
+        Optional(TIMEOUT_READ, default=TIMEOUT_API): TIMEOUT,
+        Optional(TIMEOUT_WRITE, default=DEFAULT_TIMEOUT_WRITE): TIMEOUT,
+        Optional(TIMEOUT_SETUP, default=DEFAULT_TIMEOUT_SETUP): TIMEOUT,
+    },
+    "commands": {
+        Optional(OPTIMISTIC_UPDATES, default=False): bool,
+        Optional(COMMAND_REFRESH_DELAY, default=DEFAULT_COMMAND_REFRESH_DELAY): DELAY,
+        Optional(CONTROL_BATCH_DELAY, default=DEFAULT_CONTROL_BATCH_DELAY): DELAY,
+        Optional(COMMAND_QUEUE_DEPTH, default=DEFAULT_COMMAND_QUEUE_DEPTH): SIZE,
+        Optional(NUMBER_DEBOUNCE, default=DEFAULT_NUMBER_DEBOUNCE): DELAY,
+        Optional(OFFLINE_QUEUE, default=False): bool,
+        Optional(OFFLINE_QUEUE_TTL, default=DEFAULT_OFFLINE_QUEUE_TTL): All(
+            Coerce(int), Range(min=60, max=7 * 86400)
+        ),
+    },
+}
@@ -8,6 +8,12 @@ from homeassistant.core import HomeAssistant
 from homeassistant.helpers import device_registry as dr
 from homeassistant.helpers.redact import async_redact_data
 
+from custom_components.surepcha.api import (
+    async_get_client_pool,
+    async_get_rate_limiter,
+    async_get_single_flight,
+)
+from custom_components.surepcha.const import TOKEN
 from custom_components.surepcha.coordinator import SurePetcareConfigEntry
 from custom_components.surepcha.helper import serialize
 
@@ -18,10 +24,22 @@ async def async_get_config_entry_diagnostics(
     hass: HomeAssistant, entry: SurePetcareConfigEntry
 ) -> dict[str, Any]:
     """Return diagnostics for a config entry."""
+    # Every coordinator of the entry shares its client and offline queue.
+    coordinators = getattr(entry, "runtime_data", None) or []
+    offline = next((c.offline for c in coordinators if c.offline is not None), None)
     return async_redact_data(
         {
+            "clients": async_get_client_pool(hass).as_dict(),
             "entry_data": dict(entry.data),
+            "offline_queue": offline.as_dict() if offline is not None else None,
             "options": dict(entry.options),
+            "rate_limiter": async_get_rate_limiter(
+                hass, entry.data.get(TOKEN)
+            ).as_dict(),
+            "refresh": async_get_single_flight(hass).as_dict(),
+            "timeouts": (
+                coordinators[0].client.timeouts.as_dict() if coordinators else None
+            ),
         },
         TO_REDACT,
     )
@@ -43,5 +61,13 @@ async def async_get_device_diagnostics(
             break
 
     return async_redact_data(
-        {"options": dict(entry.options), "device": serialize(device_obj)}, TO_REDACT
+        {
+            "options": dict(entry.options),
+            "device": serialize(device_obj),
+            "polling": coordinator.polling_diagnostics(),
+            "cached_at": coordinator.cached_at,
+            "cache": coordinator.cache_diagnostics(),
+            "commands": coordinator.command_diagnostics(),
+        },
+        TO_REDACT,
     )
@@ -1,21 +1,34 @@
 from __future__ import annotations
 
+import asyncio
 import logging
+from collections.abc import Callable
 from dataclasses import dataclass
-from typing import Any, cast
+from functools import partial
+from typing import Any, Final, cast
 
 from homeassistant.helpers.entity import DeviceInfo, EntityDescription
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from surepcio.devices.device import DeviceBase, PetBase
 
+from custom_components.surepcha.api import WRITE
+from custom_components.surepcha.commands import async_request_refreshes
 from custom_components.surepcha.helper import serialize
-from custom_components.surepcha.method_field import FieldContext, MethodField
-
-from .const import DOMAIN, OPTION_DEVICES
+from custom_components.surepcha.method_field import (
+    FieldContext,
+    FieldValues,
+    MethodField,
+    build_payload,
+)
+
+from .const import ATTR_CACHED_AT, DOMAIN
 from .coordinator import SurePetCareDeviceDataUpdateCoordinator
 
 logger = logging.getLogger(__name__)
 
+# Marks a value missing from the cache, as None is a valid value.
+_MISSING: Final = object()
+
 
 @dataclass(frozen=True, kw_only=True)
 class SurePetCareBaseEntityDescription(EntityDescription):
@@ -23,6 +36,12 @@ class SurePetCareBaseEntityDescription(EntityDescription):
 
     field: MethodField
     frozen: bool = False
+    # Ids of other pets and devices whose data a command setting the value
+    # changes, see commands.affected_ids. They are refreshed after it is sent.
+    affects_fn: Callable[[FieldContext, Any], set[str]] | None = None
+    # The field's commands do not depend on each other and are sent
+    # concurrently, see SurePetcareApi.api_many.
+    concurrent: bool = False
 
 
 class SurePetCareBaseEntity(CoordinatorEntity[SurePetCareDeviceDataUpdateCoordinator]):
@@ -30,7 +49,6 @@ class SurePetCareBaseEntity(CoordinatorEntity[SurePetCareDeviceDataUpdateCoordin
 
     entity_description: SurePetCareBaseEntityDescription
     _attr_has_entity_name = True
-    _cached_value: Any | None = None
 
     def __init__(
         self,
@@ -38,7 +56,16 @@ class SurePetCareBaseEntity(CoordinatorEntity[SurePetCareDeviceDataUpdateCoordin
     ) -> None:
         """Initialize a device."""
         super().__init__(coordinator)
-        self._device: DeviceBase | PetBase = coordinator.data
+        # Values derived from the field, valid for the coordinator generation.
+        self._cache: dict[str, Any] = {}
+        self._cache_generation: int | None = None
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    @property
+    def _device(self) -> DeviceBase | PetBase:
+        """Return the coordinator's current device, which may be replaced."""
+        return self.coordinator.data
 
     @property
     def device_info(self) -> DeviceInfo:
@@ -56,10 +83,12 @@ class SurePetCareBaseEntity(CoordinatorEntity[SurePetCareDeviceDataUpdateCoordin
             **({"via_device": via_device} if via_device is not None else {}),
         )
 
-    def _handle_coordinator_update(self) -> None:
-        """Handle updated data from the coordinator."""
-        self._cached_value = None
-        super()._handle_coordinator_update()
+    async def async_added_to_hass(self) -> None:
+        """Have the coordinator evaluate the field on every update."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self.coordinator.async_register_field(self, self.entity_description.field)
+        )
 
     @property
     def available(self) -> bool:
@@ -73,16 +102,24 @@ class SurePetCareBaseEntity(CoordinatorEntity[SurePetCareDeviceDataUpdateCoordin
     @property
     def native_value(self) -> str | None:
         """Return the sensor value."""
-        # Use cached value if available to avoid unnecessary processing on each update
-        if self._cached_value is None:
-            self._cached_value = serialize(
-                self.entity_description.field.get(self.context)
-            )
-        return self._cached_value
+        return self.cached("native_value", self._native_value)
+
+    def _native_value(self) -> Any:
+        return serialize(self.field_values.value)
 
     @property
     def extra_state_attributes(self) -> dict[str, Any] | None:
-        """Return extra state attributes."""
+        """Return extra state attributes.
+
+        While the device still comes from the snapshot, when it was cached is
+        added, so the state is not mistaken for a live one.
+        """
+        attributes = self.cached("extra_state_attributes", self._extra_state_attributes)
+        if (cached_at := self.coordinator.cached_at) is None:
+            return attributes
+        return {**(attributes or {}), ATTR_CACHED_AT: cached_at}
+
+    def _extra_state_attributes(self) -> dict[str, Any] | None:
         if self.native_value is None:
             return None
 
@@ -92,30 +129,40 @@ class SurePetCareBaseEntity(CoordinatorEntity[SurePetCareDeviceDataUpdateCoordin
         ):
             return None
 
-        return serialize(self.entity_description.field.get_extra(self.context))
+        return serialize(self.field_values.extra)
+
+    def cached(self, name: str, compute: Callable[[], Any]) -> Any:
+        """Return the value compute returns, computed once per coordinator update."""
+        generation = self.coordinator.generation
+        if generation != self._cache_generation:
+            self._cache.clear()
+            self._cache_generation = generation
+        if (value := self._cache.get(name, _MISSING)) is _MISSING:
+            self.cache_misses += 1
+            value = self._cache[name] = compute()
+        else:
+            self.cache_hits += 1
+        return value
+
+    @property
+    def field_values(self) -> FieldValues:
+        """Return the values of the field, evaluated by the coordinator."""
+        return self.coordinator.field_values(self, self.entity_description.field)
 
     @property
-    def context(self):
-        merged_devices = {}
-        for entry in self.hass.config_entries.async_entries(DOMAIN):
-            merged_devices.update(entry.options.get(OPTION_DEVICES, {}))
-        # Current entry takes priority
-        merged_devices.update(
-            self.coordinator.config_entry.options.get(OPTION_DEVICES, {})
+    def context(self) -> FieldContext:
+        """Return the device's context, shared with its other entities."""
+        return self.coordinator.field_context
+
+    async def send_command(self, value: Any) -> asyncio.Future[Any]:
+        """Queue a command to the device, sent in order after earlier ones.
+
+        Returns a future that is done once the command has been sent.
+        """
+        context = FieldContext(
+            self.coordinator.data, self.context.options, self.entity_id
         )
-        options = {
-            **self.coordinator.config_entry.options,
-            OPTION_DEVICES: merged_devices,
-        }
-        return FieldContext(self.coordinator.data, options, self.entity_id)
-
-    async def send_command(self, value: Any) -> None:
-        """Send command to device."""
-        self.hass.async_create_task(self._send_command(value))
-
-    async def _send_command(self, value: Any) -> None:
-        """Send command to device."""
-        command = self.entity_description.field(self.context, value)
+        command = self.entity_description.field(context, value)
         logger.debug(
             "send_command for %s: %s=%s (command: %s)",
             self.entity_id,
@@ -123,6 +170,28 @@ class SurePetCareBaseEntity(CoordinatorEntity[SurePetCareDeviceDataUpdateCoordin
             value,
             command,
         )
-        await self.coordinator.client.api(command)
-        # update entities with new data
-        await self.coordinator.async_request_refresh()
+        if context.writes:
+            # Merged with other writes to the device into a single request.
+            future = self.coordinator.commands.write(
+                build_payload(context.writes), context.writes
+            )
+            if self.coordinator.optimistic:
+                self.coordinator.async_apply_optimistic(context.writes, future)
+        else:
+            client = self.coordinator.client
+            send = client.api_many if self.entity_description.concurrent else client.api
+            future = self.coordinator.commands.call(partial(send, command, kind=WRITE))
+        if self.entity_description.affects_fn is None:
+            return future
+        # The coordinator refreshes itself after a command, only add the others.
+        affected = self.entity_description.affects_fn(context, value)
+        others = affected - {str(self._device.id)}
+        if not others:
+            return future
+
+        def refresh_others(done: asyncio.Future[Any]) -> None:
+            if not done.cancelled() and done.exception() is None:
+                async_request_refreshes(self.hass, others)
+
+        future.add_done_callback(refresh_others)
+        return future
@@ -1,6 +1,16 @@
 import logging
+import zlib
+from collections.abc import Callable
+from datetime import date, datetime, time, timedelta
 from enum import Enum
-from types import MappingProxyType
+from functools import lru_cache
+from types import (
+    BuiltinFunctionType,
+    ClassMethodDescriptorType,
+    FunctionType,
+    MappingProxyType,
+    MethodDescriptorType,
+)
 from typing import Any
 
 from pydantic import BaseModel
@@ -69,6 +79,106 @@ def stringify(value: Any) -> str | None:
 
 def serialize(obj):
     """Recursively convert objects/enums/lists/dicts to JSON-serializable types, including properties, skipping functions, and using model_dump for Pydantic models."""
+    cls = type(obj)
+    if obj.__class__ is not cls:
+        # Mocks and proxies claim a class they are not, keep to isinstance.
+        return _serialize_reflective(obj)
+    return _serializer(cls)(obj)
+
+
+def _identity(obj):
+    return obj
+
+
+def _enum_name(obj):
+    return obj.name
+
+
+def _serialize_model(obj):
+    return serialize(obj.model_dump())
+
+
+def _serialize_dict(obj):
+    return {k: serialize(v) for k, v in obj.items()}
+
+
+def _serialize_list(obj):
+    return [serialize(v) for v in obj]
+
+
+# Types converted with str, which the generic path also does as they have no
+# __dict__, looked up before it as they are common in device data.
+_STR_TYPES = frozenset({datetime, date, time, timedelta})
+# Class members that are callable when read from an instance.
+_METHOD_TYPES = (
+    FunctionType,
+    BuiltinFunctionType,
+    MethodDescriptorType,
+    ClassMethodDescriptorType,
+    classmethod,
+)
+
+
+@lru_cache(maxsize=512)
+def _serializer(cls: type) -> Callable[[Any], Any]:
+    """Return the function serializing instances of cls, in serialize's order."""
+    if issubclass(cls, Enum):
+        return _enum_name
+    if issubclass(cls, (str, int, float, bool, type(None))):
+        return _identity
+    if issubclass(cls, BaseModel):
+        return _serialize_model
+    if issubclass(cls, dict):
+        return _serialize_dict
+    if issubclass(cls, (list, tuple, set)):
+        return _serialize_list
+    if cls in _STR_TYPES:
+        return str
+    if (
+        cls.__getattribute__ is not object.__getattribute__
+        or hasattr(cls, "__getattr__")
+        or cls.__dir__ is not object.__dir__
+    ):
+        return _serialize_reflective
+    if cls.__dictoffset__:
+        return _object_serializer(cls)
+    return str
+
+
+def _object_serializer(cls: type) -> Callable[[Any], Any]:
+    """Plan the public class members of cls that serialize reads.
+
+    Methods are callable on every instance and left out here, the others,
+    such as properties, are read from the instance and kept unless callable.
+    """
+    members: dict[str, Any] = {}
+    for klass in reversed(cls.__mro__):
+        members.update(klass.__dict__)
+    names = []
+    for name in sorted(members):
+        member = members[name]
+        if name.startswith("_") or isinstance(member, _METHOD_TYPES):
+            continue
+        if isinstance(member, staticmethod) and callable(member.__func__):
+            continue
+        names.append(name)
+
+    def convert(obj):
+        result = {
+            k: serialize(v) for k, v in obj.__dict__.items() if not k.startswith("_")
+        }
+        for name in names:
+            if name not in result:
+                value = getattr(obj, name, None)
+                if not callable(value):
+                    result[name] = serialize(value)
+        return result
+
+    return convert
+
+
+def _serialize_reflective(obj):
+    """serialize for objects whose attributes cannot be planned per class."""
     if isinstance(obj, Enum):
         return obj.name
     if isinstance(obj, (str, int, float, bool, type(None))):
@@ -98,6 +208,17 @@ def serialize(obj):
     return str(obj)
 
 
+def fingerprint(device) -> int:
+    """Return a stable hash of the device's status and control models."""
+    parts = []
+    for name in ("status", "control"):
+        model = getattr(device, name, None)
+        parts.append(
+            model.model_dump_json() if isinstance(model, BaseModel) else repr(model)
+        )
+    return zlib.crc32("\n".join(parts).encode())
+
+
 def traverse_attrs(obj, *attrs):
     """Traverse attributes and return an iterator, or an empty iterator if missing or not a list."""
     for attr in attrs:
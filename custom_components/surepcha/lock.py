@@ -97,4 +97,4 @@ class SurePetCareLock(SurePetCareBaseEntity, LockEntity):
 
     def lock_state(self):
         """Return the lock state."""
-        return self.entity_description.field.get(self.context)
+        return self.field_values.value
@@ -4,6 +4,7 @@ import logging
 import re
 from collections.abc import Callable
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Any
 
 from homeassistant.components.lock.const import LockState
@@ -18,6 +19,8 @@ class FieldContext:
         self.device = device
         self.options = options
         self.entity_id = entity_id
+        # (path, value) pairs written through path based set_fn calls.
+        self.writes: list[tuple[str, Any]] = []
 
 
 def build_nested_dict(field_path, value):
@@ -37,34 +40,104 @@ def build_nested_dict(field_path, value):
     return result
 
 
-def get_by_path(obj, path):
-    """Traverse a dotted path with optional list indices (e.g. 'control.bowls.settings[1].target').
-    Works for both dicts and objects. If path is a dict, returns a dict of results.
+def merge_nested(base, update):
+    """Deep merge two results of build_nested_dict, update winning.
+
+    Dicts are merged per key and lists per index. None list items are the
+    padding build_nested_dict adds before an index, so they keep base's item.
     """
-    if isinstance(path, dict):
-        return {k: get_by_path(obj, v) for k, v in path.items()}
+    if isinstance(base, dict) and isinstance(update, dict):
+        merged = dict(base)
+        for key, value in update.items():
+            merged[key] = merge_nested(base.get(key), value)
+        return merged
+    if isinstance(base, list) and isinstance(update, list):
+        merged = base + [None] * (len(update) - len(base))
+        for idx, item in enumerate(update):
+            if item is not None:
+                merged[idx] = merge_nested(merged[idx], item)
+        return merged
+    return update
+
+
+def build_payload(writes):
+    """Merge (path, value) writes into a single set_control payload."""
+    payload = {}
+    for path, value in writes:
+        payload = merge_nested(payload, build_nested_dict(path, value))
+    return payload
+
+
+@lru_cache(maxsize=512)
+def _compile_path(path: str) -> Callable[[Any], Any]:
+    """Return a getter for a dotted path, parsed once."""
+    steps: list[tuple[str, int | None]] = []
     for part in path.split("."):
-        if obj is None:
-            return None
-        match = _LIST_INDEX_RE.match(part)
-        if match:
+        if match := _LIST_INDEX_RE.match(part):
             key, idx = match.groups()
+            steps.append((key, int(idx)))
+        else:
+            steps.append((part, None))
+
+    def get(obj):
+        for key, idx in steps:
+            if obj is None:
+                return None
             if isinstance(obj, dict):
                 obj = obj.get(key)
             else:
                 obj = getattr(obj, key, None)
+            if idx is None:
+                continue
             if obj is None:
                 return None
             try:
-                obj = obj[int(idx)]
-            except IndexError, ValueError, TypeError, KeyError:
+                obj = obj[idx]
+            except IndexError, TypeError, KeyError:
                 return None
-        else:
-            if isinstance(obj, dict):
-                obj = obj.get(part)
+        return obj
+
+    return get
+
+
+def compile_path(path: str | dict) -> Callable[[Any], Any]:
+    """Return a getter behaving like get_by_path for path, parsed only once."""
+    if isinstance(path, dict):
+        getters = {k: compile_path(v) for k, v in path.items()}
+        return lambda obj: {k: get(obj) for k, get in getters.items()}
+    return _compile_path(path)
+
+
+def get_by_path(obj, path):
+    """Traverse a dotted path with optional list indices (e.g. 'control.bowls.settings[1].target').
+    Works for both dicts and objects. If path is a dict, returns a dict of results.
+    """
+    return compile_path(path)(obj)
+
+
+def set_by_path(obj, path, value) -> bool:
+    """Set the value at a path as read by get_by_path.
+
+    Returns False if the path does not exist or the value could not be set.
+    """
+    *parents, last = path.split(".")
+    parent = get_by_path(obj, ".".join(parents)) if parents else obj
+    if parent is None:
+        return False
+    try:
+        if match := _LIST_INDEX_RE.match(last):
+            key, idx = match.groups()
+            if isinstance(parent, dict):
+                parent[key][int(idx)] = value
             else:
-                obj = getattr(obj, part, None)
-    return obj
+                getattr(parent, key)[int(idx)] = value
+        elif isinstance(parent, dict):
+            parent[last] = value
+        else:
+            setattr(parent, last, value)
+    except IndexError, ValueError, TypeError, KeyError, AttributeError:
+        return False
+    return True
 
 
 @dataclass(frozen=True, slots=True)
@@ -80,30 +153,33 @@ class MethodField:
     entity_picture: str | None = None
 
     def __post_init__(self):
-        """Set default get_fn and set_fn if not provided but path is."""
+        """Set default get_fn and set_fn if not provided but path is.
+
+        Paths are compiled here, so reading a value does not parse them again.
+        """
         if self.path:
             # Only set get_fn default if not explicitly provided
             if self.get_fn is None:
-                object.__setattr__(
-                    self, "get_fn", lambda ctx: get_by_path(ctx.device, self.path)
-                )
+                get = compile_path(self.path)
+                object.__setattr__(self, "get_fn", lambda ctx: get(ctx.device))
             # Only set set_fn default if not explicitly provided
             if self.set_fn is None:
+                path = self.path
                 object.__setattr__(
                     self,
                     "set_fn",
-                    lambda ctx, value: ctx.device.set_control(
-                        **build_nested_dict(self.path, value)
-                    ),
+                    lambda ctx, value: self._set_control(path, ctx, value),
                 )
 
         # Set get_extra_fn from path_extra if not explicitly provided
         if self.path_extra and self.get_extra_fn is None:
-            object.__setattr__(
-                self,
-                "get_extra_fn",
-                lambda ctx: get_by_path(ctx.device, self.path_extra),
-            )
+            get_extra = compile_path(self.path_extra)
+            object.__setattr__(self, "get_extra_fn", lambda ctx: get_extra(ctx.device))
+
+    def _set_control(self, path: str, context: FieldContext, value: Any) -> Any:
+        """Build a set_control command for the value at path."""
+        context.writes.append((path, value))
+        return context.device.set_control(**build_nested_dict(path, value))
 
     def get(self, context: FieldContext) -> Any:
         """Get the value from the device."""
@@ -149,6 +225,54 @@ class MethodField:
         return self.set(context, value)
 
 
+def _evaluate(fn: Callable[..., Any], *args: Any) -> tuple[Any, Exception | None]:
+    try:
+        return fn(*args), None
+    except Exception as err:  # noqa: BLE001 - raised again when it is read
+        return None, err
+
+
+def _unwrap(result: tuple[Any, Exception | None]) -> Any:
+    value, err = result
+    if err is not None:
+        raise err
+    return value
+
+
+class FieldValues:
+    """Values of a field evaluated once for an update of the device.
+
+    An error raised evaluating one of them is raised again when it is read,
+    so a failing field does not keep the other fields from being evaluated.
+    """
+
+    __slots__ = ("_extra", "_picture", "_value")
+
+    def __init__(self, field: MethodField, context: FieldContext) -> None:
+        self._value = _evaluate(field.get, context)
+        self._extra = (
+            _evaluate(field.get_extra, context)
+            if field.path_extra or field.get_extra_fn
+            else (None, None)
+        )
+        self._picture = _evaluate(field.get_entity_picture, context.device)
+
+    @property
+    def value(self) -> Any:
+        """Return the value of the field."""
+        return _unwrap(self._value)
+
+    @property
+    def extra(self) -> Any:
+        """Return the extra attributes, None if the field has none."""
+        return _unwrap(self._extra)
+
+    @property
+    def picture(self) -> str | None:
+        """Return the entity picture URL, None if the field has none."""
+        return _unwrap(self._picture)
+
+
 @dataclass(frozen=True, slots=True)
 class ButtonMethodField(MethodField):
     """MethodField for button-like entities, supporting on mapping."""
@@ -1,7 +1,11 @@
 """Support for Sure Petcare number entity."""
 
+import asyncio
 import logging
+from collections.abc import Callable
 from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
 
 from homeassistant.components.number import (
     NumberEntity,
@@ -9,13 +13,15 @@ from homeassistant.components.number import (
     NumberMode,
 )
 from homeassistant.const import UnitOfMass
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers.entity_platform import AddConfigEntryEntitiesCallback
+from homeassistant.helpers.event import async_call_later
 from surepcio.enums import ProductId
 
 from custom_components.surepcha.method_field import MethodField
 
+from .const import DEFAULT_NUMBER_DEBOUNCE, NUMBER_DEBOUNCE
 from .coordinator import SurePetcareConfigEntry, SurePetCareDeviceDataUpdateCoordinator
 from .entity import (
     SurePetCareBaseEntity,
@@ -83,6 +89,11 @@ class SurePetCareNumber(SurePetCareBaseEntity, NumberEntity):
     """The platform class required by Home Assistant."""
 
     entity_description: SurePetCareNumberEntityDescription
+    # Value set while the debounce runs, shown until the refresh after the
+    # command sending it is done, or until that command fails.
+    _pending_value: float | None = None
+    _cancel_send: Callable[[], None] | None = None
+    _sending: asyncio.Future[Any] | None = None
 
     def __init__(
         self,
@@ -95,13 +106,77 @@ class SurePetCareNumber(SurePetCareBaseEntity, NumberEntity):
         )
         self.entity_description = description
         self._attr_unique_id = f"{coordinator._device.id}-{description.key}"
+        self._debounce = coordinator.config_entry.options.get(
+            NUMBER_DEBOUNCE, DEFAULT_NUMBER_DEBOUNCE
+        )
 
     async def async_set_native_value(self, value: float) -> None:  # type: ignore[override]
-        """Set new value."""
-        await self.send_command(value)
+        """Set new value.
+
+        With a debounce configured, a slider being dragged only sends the
+        value it settles on.
+        """
+        if not self._debounce:
+            await self.send_command(value)
+            return
+        self._pending_value = value
+        if self._cancel_send is not None:
+            self._cancel_send()
+        self._cancel_send = async_call_later(
+            self.hass, self._debounce, self._async_send_pending
+        )
+        self.async_write_ha_state()
+
+    async def _async_send_pending(self, _now: datetime) -> None:
+        self._cancel_send = None
+        if self._pending_value is None:
+            return
+        self._sending = sending = await self.send_command(self._pending_value)
+
+        def sent(done: asyncio.Future[Any]) -> None:
+            if self._sending is not done:
+                return
+            self._sending = None
+            if done.cancelled() or done.exception() is not None:
+                self._async_drop_pending()
+            else:
+                # Show what the cloud kept, even if that is the old value.
+                self.coordinator.async_on_command_refresh(self._async_drop_pending)
+
+        sending.add_done_callback(sent)
+
+    @callback
+    def _async_drop_pending(self) -> None:
+        """Show the device's value again, unless a newer value is pending."""
+        if (
+            self._pending_value is None
+            or self._cancel_send is not None
+            or self._sending is not None
+        ):
+            return
+        self._pending_value = None
+        self.async_write_ha_state()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Keep showing the pending value until it has been sent."""
+        if self._cancel_send is None and self._sending is None:
+            self._pending_value = None
+        super()._handle_coordinator_update()
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Drop a value that has not been sent yet."""
+        if self._cancel_send is not None:
+            self._cancel_send()
+            self._cancel_send = None
+        self._pending_value = None
+        self._sending = None
+        await super().async_will_remove_from_hass()
 
     @property
     def native_value(self) -> float | None:  # type: ignore[override]
         """Return the current value."""
+        if self._pending_value is not None:
+            return self._pending_value
         value = super().native_value
         return float(value) if value is not None else None
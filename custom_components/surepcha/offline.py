@@ -0,0 +1,126 @@
+"""Persistent queue of device writes that could not be sent yet."""
+
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+
+logger = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+SAVE_DELAY = 5
+# Replays of a device's writes back off from this up to REPLAY_MAX_DELAY.
+REPLAY_BASE_DELAY = 30.0
+REPLAY_MAX_DELAY = 900.0
+
+type Writes = list[tuple[str, Any]]
+
+
+def replay_delay(attempts: int) -> float:
+    """Return seconds to wait before the next replay after failed attempts."""
+    return min(REPLAY_MAX_DELAY, REPLAY_BASE_DELAY * 2 ** max(attempts - 1, 0))
+
+
+class OfflineCommandStore:
+    """Writes of a config entry that failed to send, kept across restarts.
+
+    Writes are kept per device and path in the order they were queued. A
+    newer write to the same path replaces the older one, and writes older
+    than ttl seconds are dropped instead of sent.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry, ttl: float) -> None:
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.offline.{entry.entry_id}", private=True
+        )
+        self.ttl = ttl
+        # device id -> path -> {"value": ..., "queued_at": timestamp}
+        self._writes: dict[str, dict[str, dict[str, Any]]] = {}
+        self.queued = 0
+        self.coalesced = 0
+        self.expired = 0
+        self.sent = 0
+
+    async def async_load(self) -> None:
+        """Load the writes left from before the restart."""
+        if data := await self._store.async_load():
+            self._writes = data["writes"]
+        self._drop_expired()
+
+    async def async_remove(self) -> None:
+        """Delete the stored writes."""
+        self._writes = {}
+        await self._store.async_remove()
+
+    def add(self, device_id: Any, writes: Writes) -> None:
+        """Keep writes to a device until they can be sent."""
+        now = dt_util.utcnow().timestamp()
+        device = self._writes.setdefault(str(device_id), {})
+        for path, value in writes:
+            if (old := device.get(path)) is not None:
+                if old["value"] == value:
+                    # Failed again on replay, which must not restart its ttl.
+                    continue
+                del device[path]
+                self.coalesced += 1
+            device[path] = {"value": value, "queued_at": now}
+            self.queued += 1
+        self._schedule_save()
+
+    def pending(self, device_id: Any) -> Writes:
+        """Return the unexpired writes to a device, oldest first."""
+        if self._drop_expired():
+            self._schedule_save()
+        return [
+            (path, write["value"])
+            for path, write in self._writes.get(str(device_id), {}).items()
+        ]
+
+    def remove(self, device_id: Any, paths: list[str]) -> None:
+        """Forget the writes to paths a later write has been sent to."""
+        if not (device := self._writes.get(str(device_id))):
+            return
+        for path in paths:
+            if device.pop(path, None) is not None:
+                self.sent += 1
+        if not device:
+            del self._writes[str(device_id)]
+        self._schedule_save()
+
+    def _drop_expired(self) -> bool:
+        cutoff = dt_util.utcnow().timestamp() - self.ttl
+        dropped = False
+        for device_id, device in list(self._writes.items()):
+            for path, write in list(device.items()):
+                if write["queued_at"] < cutoff:
+                    logger.info(
+                        "Dropping write of %s to %s, queued too long ago",
+                        path,
+                        device_id,
+                    )
+                    del device[path]
+                    self.expired += 1
+                    dropped = True
+            if not device:
+                del self._writes[device_id]
+        return dropped
+
+    def _schedule_save(self) -> None:
+        self._store.async_delay_save(lambda: {"writes": self._writes}, SAVE_DELAY)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return queue counters for diagnostics."""
+        return {
+            "pending": sum(len(device) for device in self._writes.values()),
+            "queued": self.queued,
+            "coalesced": self.coalesced,
+            "expired": self.expired,
+            "sent": self.sent,
+        }
@@ -0,0 +1,67 @@
+"""Entry options as read by the fields of entities."""
+
+from __future__ import annotations
+
+import logging
+from types import MappingProxyType
+from typing import Any
+
+from homeassistant.config_entries import (
+    SIGNAL_CONFIG_ENTRY_CHANGED,
+    ConfigEntry,
+    ConfigEntryChange,
+)
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+
+from .const import DOMAIN, MERGED_OPTIONS, OPTION_DEVICES
+
+logger = logging.getLogger(__name__)
+
+
+class MergedOptions:
+    """Options of each entry with the device options of all entries merged in.
+
+    Fields look up names and products of devices from other entries too, so
+    the view of an entry depends on every entry of the integration. Views are
+    built once and dropped whenever any of those entries changes.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self._hass = hass
+        self._views: dict[str, MappingProxyType[str, Any]] = {}
+        self.builds = 0
+        async_dispatcher_connect(
+            hass, SIGNAL_CONFIG_ENTRY_CHANGED, self._async_entry_changed
+        )
+
+    @callback
+    def _async_entry_changed(
+        self, _change: ConfigEntryChange, entry: ConfigEntry
+    ) -> None:
+        if entry.domain == DOMAIN:
+            self._views.clear()
+
+    def get(self, entry: ConfigEntry) -> MappingProxyType[str, Any]:
+        """Return the merged options of entry."""
+        if (view := self._views.get(entry.entry_id)) is not None:
+            return view
+        merged_devices: dict[str, Any] = {}
+        for other in self._hass.config_entries.async_entries(DOMAIN):
+            merged_devices.update(other.options.get(OPTION_DEVICES, {}))
+        # Current entry takes priority
+        merged_devices.update(entry.options.get(OPTION_DEVICES, {}))
+        view = self._views[entry.entry_id] = MappingProxyType(
+            {**entry.options, OPTION_DEVICES: merged_devices}
+        )
+        self.builds += 1
+        logger.debug("Built merged options for %s", entry.title)
+        return view
+
+
+@callback
+def async_get_merged_options(hass: HomeAssistant) -> MergedOptions:
+    """Return the merged options shared by all entries."""
+    if (merged := hass.data.get(MERGED_OPTIONS)) is None:
+        merged = hass.data[MERGED_OPTIONS] = MergedOptions(hass)
+    return merged
@@ -0,0 +1,172 @@
+"""Poll scheduling helpers for SurePetCare coordinators."""
+
+import random
+import zlib
+from collections.abc import Iterable
+from typing import Any
+
+# Never schedule a poll closer than this to the previous one, even if the
+# coordinator's phase slot is due sooner (e.g. after a command refresh).
+POLL_MIN_GAP = 5.0
+
+ADAPTIVE_BACKOFF = 1.5
+ADAPTIVE_SPEEDUP = 0.5
+# Weight of the newest gap in the running average of time between changes.
+ADAPTIVE_SMOOTHING = 0.3
+
+BREAKER_THRESHOLD = 3
+BREAKER_MAX_DELAY = 3600.0
+BREAKER_JITTER = 0.2
+
+
+def stable_fraction(value: Any) -> float:
+    """Return a deterministic number in [0, 1) for value."""
+    return zlib.crc32(str(value).encode()) / 2**32
+
+
+def poll_phases(ids: Iterable[Any], seed: Any) -> dict[Any, float]:
+    """Spread ids evenly over one poll interval.
+
+    Returns each id's phase as a fraction of the interval. Ids get equally
+    wide slots in sorted order with a deterministic jitter inside the first
+    half of the slot, and the whole grid is shifted by seed so separate
+    households do not line up either.
+    """
+    ordered = sorted({str(i) for i in ids})
+    base = stable_fraction(seed)
+    return {
+        id_: (base + (rank + 0.5 * stable_fraction(f"{seed}:{id_}")) / len(ordered))
+        % 1.0
+        for rank, id_ in enumerate(ordered)
+    }
+
+
+def next_poll_delay(now: float, interval: float, phase: float) -> float:
+    """Return seconds from now until the next poll slot of the given phase."""
+    delay = interval - ((now - phase * interval) % interval)
+    if delay < min(interval / 2, POLL_MIN_GAP):
+        delay += interval
+    return delay
+
+
+class AdaptiveInterval:
+    """Poll interval that follows how often a device's data changes.
+
+    Every refresh that shows new data halves the interval and updates a
+    running average of the time between changes, which the interval is kept
+    below. Every unchanged refresh backs the interval off, within bounds.
+    """
+
+    def __init__(self, interval: float, minimum: float, maximum: float) -> None:
+        self.minimum = minimum
+        self.maximum = maximum
+        self.interval = self._clamp(interval)
+        self.change_gap: float | None = None
+        self._fingerprint: int | None = None
+        self._changed_at = 0.0
+
+    def _clamp(self, interval: float) -> float:
+        return min(max(interval, self.minimum), self.maximum)
+
+    def update(self, fingerprint: int, now: float) -> float:
+        """Record the latest refresh result and return the next interval."""
+        if self._fingerprint is None:
+            self._fingerprint = fingerprint
+            self._changed_at = now
+            return self.interval
+        if fingerprint == self._fingerprint:
+            self.interval = self._clamp(self.interval * ADAPTIVE_BACKOFF)
+            return self.interval
+
+        gap = now - self._changed_at
+        self.change_gap = (
+            gap
+            if self.change_gap is None
+            else ADAPTIVE_SMOOTHING * gap + (1 - ADAPTIVE_SMOOTHING) * self.change_gap
+        )
+        self._fingerprint = fingerprint
+        self._changed_at = now
+        self.interval = self._clamp(
+            min(self.interval * ADAPTIVE_SPEEDUP, self.change_gap / 2)
+        )
+        return self.interval
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the adaptive state for diagnostics."""
+        return {
+            "interval": round(self.interval, 1),
+            "minimum": self.minimum,
+            "maximum": self.maximum,
+            "change_gap": (
+                round(self.change_gap, 1) if self.change_gap is not None else None
+            ),
+        }
+
+
+class CircuitBreaker:
+    """Stop refreshing a device that keeps failing.
+
+    After threshold failures in a row the breaker opens and refreshes are
+    skipped for a jittered delay that doubles with every further failure.
+    Once the delay has passed a single half-open probe is let through: a
+    success closes the breaker, a failure opens it again for longer.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        base_delay: float,
+        threshold: int = BREAKER_THRESHOLD,
+        max_delay: float = BREAKER_MAX_DELAY,
+    ) -> None:
+        self.base_delay = base_delay
+        self.threshold = threshold
+        self.max_delay = max_delay
+        self.state = self.CLOSED
+        self.failures = 0
+        self._retry_at = 0.0
+
+    def allow(self, now: float) -> bool:
+        """Return whether a refresh may be sent now."""
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN and now >= self._retry_at:
+            self.state = self.HALF_OPEN
+            return True
+        return False
+
+    def retry_in(self, now: float) -> float | None:
+        """Return seconds until a probe is allowed, or None if not open."""
+        if self.state != self.OPEN:
+            return None
+        return max(0.0, self._retry_at - now)
+
+    def record_success(self) -> None:
+        """Close the breaker after a successful refresh."""
+        self.state = self.CLOSED
+        self.failures = 0
+
+    def record_failure(self, now: float) -> None:
+        """Count a failed refresh, opening the breaker once over threshold."""
+        self.failures += 1
+        if self.state != self.HALF_OPEN and self.failures < self.threshold:
+            return
+        delay = min(
+            self.max_delay, self.base_delay * 2 ** (self.failures - self.threshold)
+        )
+        self._retry_at = now + delay * random.uniform(
+            1 - BREAKER_JITTER, 1 + BREAKER_JITTER
+        )
+        self.state = self.OPEN
+
+    def as_dict(self, now: float) -> dict[str, Any]:
+        """Return the breaker state for diagnostics."""
+        retry_in = self.retry_in(now)
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "retry_in": round(retry_in, 1) if retry_in is not None else None,
+        }
@@ -30,6 +30,7 @@ from custom_components.surepcha.helper import (
 )
 from custom_components.surepcha.method_field import SelectMethodField
 
+from .commands import affected_ids
 from .const import (
     DEVICES,
     NAME,
@@ -53,6 +54,14 @@ class SurePetCareSelectEntityDescription(
     """Describes SurePetCare select entity."""
 
 
+def tag_affects(ctx, option: str) -> set[str]:
+    """Return the ids of the pet and the device whose tag the option changes."""
+    device_id = find_entity_id_by_name(ctx.options, option)
+    return affected_ids(
+        "set_tag", pet=[ctx.device.id], device=[device_id] if device_id else []
+    )
+
+
 def resolve_select_option_value(desc, selected_option: str) -> Any:
     """Resolve the correct value for a select option, handling Enum classes or plain lists."""
     if (
@@ -141,6 +150,7 @@ SELECTS: dict[str, tuple[SurePetCareSelectEntityDescription, ...]] = {
                     )
                 ),
             ),
+            affects_fn=tag_affects,
         ),
         SurePetCareSelectEntityDescription(
             key="add_assigned_device",
@@ -164,6 +174,7 @@ SELECTS: dict[str, tuple[SurePetCareSelectEntityDescription, ...]] = {
                     else None
                 ),
             ),
+            affects_fn=tag_affects,
         ),
     ),
     ProductId.HUB: (
@@ -258,7 +269,7 @@ class SurePetCareSelect(SurePetCareBaseEntity, SelectEntity):
         # Use options_fn if present
         options_fn = getattr(desc.field, "options_fn", None)
         if options_fn:
-            return options_fn(self.context)
+            return self.cached("options", lambda: options_fn(self.context))
 
         # Fallback to static options if present
         opts = desc.options
@@ -458,8 +458,4 @@ class SurePetCareSensor(SurePetCareBaseEntity, SensorEntity):
     @property
     def entity_picture(self) -> str | None:
         """Return the entity picture URL to use for the entity."""
-        if entity_picture := self.entity_description.field.get_entity_picture(
-            self._device
-        ):
-            return entity_picture
-        return None
+        return self.cached("entity_picture", lambda: self.field_values.picture or None)
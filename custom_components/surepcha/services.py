@@ -7,6 +7,8 @@ from homeassistant.helpers.device_registry import async_get as async_get_device_
 from surepcio.devices import Pet
 from surepcio.enums import ModifyDeviceTag, PetDeviceLocationProfile, PetLocation
 
+from .api import WRITE
+from .commands import affected_ids, async_request_refreshes
 from .const import DOMAIN
 from .coordinator import (
     SurePetCareDeviceDataUpdateCoordinator,
@@ -60,9 +62,7 @@ async def async_set_debug_logging(call):
 )
 async def async_set_control(call):
     coordinator = get_coordinator(call.hass, call.data.get("device_id"))
-    await coordinator.client.api(
-        coordinator._device.set_control(**call.data.get("control"))
-    )
+    await coordinator.async_set_control(call.data.get("control"))
 
 
 @global_service(
@@ -81,7 +81,16 @@ async def async_set_tag(call):
     await device_coordinator.client.api(
         device_coordinator._device.set_tag(
             pet_coordinator._device.tag, ModifyDeviceTag[call.data.get("action")]
-        )
+        ),
+        WRITE,
+    )
+    async_request_refreshes(
+        call.hass,
+        affected_ids(
+            "set_tag",
+            device=[device_coordinator._device.id],
+            pet=[pet_coordinator._device.id],
+        ),
     )
 
 
@@ -103,7 +112,16 @@ async def set_pet_access_mode(call) -> None:
         pet_coordinator._device.set_profile(
             device_coordinator._device.id,
             PetDeviceLocationProfile[call.data.get("profile")],
-        )
+        ),
+        WRITE,
+    )
+    async_request_refreshes(
+        call.hass,
+        affected_ids(
+            "set_profile",
+            device=[device_coordinator._device.id],
+            pet=[pet_coordinator._device.id],
+        ),
     )
 
 
@@ -121,8 +139,9 @@ async def set_pet_position(call) -> None:
     pet_coordinator = get_coordinator(call.hass, call.data.get("pet_id"))
     device: Pet = pet_coordinator._device
     await pet_coordinator.client.api(
-        device.set_position(PetLocation[call.data.get("action")])
+        device.set_position(PetLocation[call.data.get("action")]), WRITE
     )
+    async_request_refreshes(call.hass, affected_ids("set_position", pet=[device.id]))
 
 
 @global_service(
@@ -0,0 +1,116 @@
+"""Persistent snapshot of a config entry's devices for fast startup."""
+
+from __future__ import annotations
+
+import logging
+from datetime import datetime
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+from pydantic import BaseModel
+from surepcio.devices import load_device_class
+from surepcio.devices.device import SurePetCareBase
+
+from .const import DOMAIN, PRODUCT_ID
+
+if TYPE_CHECKING:
+    from .coordinator import SurePetCareDeviceDataUpdateCoordinator
+
+logger = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+# Coordinators update one after another, so batch them into one write.
+SAVE_DELAY = 30
+
+
+def _dump(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json", by_alias=True)
+    return value
+
+
+def dump_device(device: SurePetCareBase) -> dict[str, Any]:
+    """Return the data needed to rebuild a device or pet."""
+    timezone = getattr(device, "timezone", None)
+    return {
+        "entity_info": _dump(device.entity_info),
+        "status": _dump(device.status),
+        "control": _dump(device.control),
+        "timezone": str(timezone) if timezone is not None else None,
+    }
+
+
+def restore_device(data: dict[str, Any]) -> SurePetCareBase:
+    """Rebuild a device or pet from dump_device data."""
+    entity_info = data["entity_info"]
+    device = load_device_class(entity_info[PRODUCT_ID])(
+        entity_info, timezone=data["timezone"]
+    )
+    if data["status"] is not None:
+        device.status = device.statusCls(**data["status"])
+    if data["control"] is not None:
+        device.control = device.controlCls(**data["control"])
+    return device
+
+
+class DeviceSnapshotStore:
+    """Last known devices of a config entry, kept across restarts."""
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.snapshot.{entry.entry_id}", private=True
+        )
+        self.saved_at: datetime | None = None
+
+    async def async_load(self) -> list[SurePetCareBase] | None:
+        """Return the cached devices, or None if there is no usable snapshot."""
+        if not (data := await self._store.async_load()):
+            return None
+        try:
+            devices = [restore_device(device) for device in data["devices"]]
+        except Exception:
+            logger.warning("Ignoring unreadable device snapshot", exc_info=True)
+            return None
+        self.saved_at = dt_util.parse_datetime(data["saved_at"])
+        return devices
+
+    async def async_save(self, devices: list[SurePetCareBase]) -> None:
+        """Replace the snapshot with devices right away."""
+        await self._store.async_save(self._data(devices))
+
+    async def async_remove(self) -> None:
+        """Delete the snapshot."""
+        await self._store.async_remove()
+
+    @callback
+    def async_track(
+        self,
+        entry: ConfigEntry,
+        coordinators: list[SurePetCareDeviceDataUpdateCoordinator],
+        save: bool = True,
+    ) -> None:
+        """Save a new snapshot whenever one of the coordinators has new data."""
+
+        @callback
+        def schedule_save() -> None:
+            self._store.async_delay_save(
+                lambda: self._data(
+                    [c.data for c in coordinators if c.data is not None]
+                ),
+                SAVE_DELAY,
+            )
+
+        for coordinator in coordinators:
+            entry.async_on_unload(coordinator.async_add_listener(schedule_save))
+        if save:
+            schedule_save()
+
+    @staticmethod
+    def _data(devices: list[SurePetCareBase]) -> dict[str, Any]:
+        return {
+            "saved_at": dt_util.utcnow().isoformat(),
+            "devices": [dump_device(device) for device in devices],
+        }
@@ -17,6 +17,7 @@ from custom_components.surepcha.helper import (
 )
 from custom_components.surepcha.method_field import SwitchMethodField
 
+from .commands import affected_ids
 from .const import FLAP_PRODUCTS
 from .coordinator import SurePetcareConfigEntry, SurePetCareDeviceDataUpdateCoordinator
 from .entity import (
@@ -45,6 +46,15 @@ def profile_is_indoor(ctx) -> bool | None:
     return profiles == {PetDeviceLocationProfile.INDOOR_ONLY}
 
 
+def flap_ids(ctx) -> list[str]:
+    """Return the ids of the flap devices assigned to the pet."""
+    return [
+        str(d.id)
+        for d in list_attr(ctx.device.status, "devices", "items")
+        if option_product_id(ctx.options, d.id) in FLAP_PRODUCTS
+    ]
+
+
 def set_profile(ctx, value) -> list[Command]:
     """Set all flap devices to the given profile and return the results."""
     pet = ctx.device
@@ -77,14 +87,12 @@ SWITCHES: dict[str, tuple[SurePetCareSwitchEntityDescription, ...]] = {
                 set_fn=set_profile,
                 on=PetDeviceLocationProfile.INDOOR_ONLY,
                 off=PetDeviceLocationProfile.NO_RESTRICTION,
-                get_extra_fn=lambda ctx: {
-                    "flap_devices": [
-                        str(d.id)
-                        for d in list_attr(ctx.device.status, "devices", "items")
-                        if option_product_id(ctx.options, d.id) in FLAP_PRODUCTS
-                    ]
-                },
+                get_extra_fn=lambda ctx: {"flap_devices": flap_ids(ctx)},
+            ),
+            affects_fn=lambda ctx, value: affected_ids(
+                "set_profile", pet=[ctx.device.id], device=flap_ids(ctx)
             ),
+            concurrent=True,
             icon="mdi:door",
         ),
         SurePetCareSwitchEntityDescription(
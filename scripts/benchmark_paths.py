@@ -0,0 +1,56 @@
+"""Compare reading MethodField paths compiled once with parsing them per read.
+
+Run with: python -m scripts.benchmark_paths
+"""
+
+import timeit
+from types import SimpleNamespace
+
+from custom_components.surepcha.method_field import _LIST_INDEX_RE, compile_path
+
+PATH = "status.bowl_status[0].current_weight"
+DEVICE = SimpleNamespace(
+    status=SimpleNamespace(bowl_status=[SimpleNamespace(current_weight=42.0)])
+)
+NUMBER = 200_000
+
+
+def parse_per_read(obj, path):
+    """get_by_path as it was before paths were compiled."""
+    for part in path.split("."):
+        if obj is None:
+            return None
+        match = _LIST_INDEX_RE.match(part)
+        if match:
+            key, idx = match.groups()
+            if isinstance(obj, dict):
+                obj = obj.get(key)
+            else:
+                obj = getattr(obj, key, None)
+            if obj is None:
+                return None
+            try:
+                obj = obj[int(idx)]
+            except IndexError, ValueError, TypeError, KeyError:
+                return None
+        else:
+            if isinstance(obj, dict):
+                obj = obj.get(part)
+            else:
+                obj = getattr(obj, part, None)
+    return obj
+
+
+def main():
+    get = compile_path(PATH)
+    assert get(DEVICE) == parse_per_read(DEVICE, PATH)
+    parsed = timeit.timeit(lambda: parse_per_read(DEVICE, PATH), number=NUMBER)
+    compiled = timeit.timeit(lambda: get(DEVICE), number=NUMBER)
+    print(f"{PATH!r}, {NUMBER} reads")
+    print(f"parsed per read: {parsed * 1e9 / NUMBER:8.0f} ns/read")
+    print(f"compiled:        {compiled * 1e9 / NUMBER:8.0f} ns/read")
+    print(f"speedup:         {parsed / compiled:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
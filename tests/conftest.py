@@ -1,5 +1,6 @@
-from collections.abc import Generator
+from collections.abc import Callable, Generator
 from enum import Enum
+from typing import Any
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
@@ -156,6 +157,24 @@ def mock_config_entry() -> MockConfigEntry:
     )
 
 
+@pytest.fixture
+def entry_with_options(
+    mock_config_entry: MockConfigEntry,
+) -> Callable[..., MockConfigEntry]:
+    """Return a factory for copies of the mocked entry with extra options."""
+
+    def factory(**options: Any) -> MockConfigEntry:
+        return MockConfigEntry(
+            title=mock_config_entry.title,
+            domain=DOMAIN,
+            data=dict(mock_config_entry.data),
+            options={**mock_config_entry.options, **options},
+            unique_id=mock_config_entry.unique_id,
+        )
+
+    return factory
+
+
 @pytest.fixture
 def mock_config_entry_missing_entities() -> MockConfigEntry:
     """Mock a config entry with missing entities."""
@@ -0,0 +1,358 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from homeassistant.core import HomeAssistant
+
+from custom_components.surepcha.api import (
+    BACKGROUND_EVERY,
+    READ,
+    SETUP,
+    WRITE,
+    ClientPool,
+    CommandsFailed,
+    RateLimiter,
+    SingleFlight,
+    SurePetcareApi,
+    async_get_rate_limiter,
+    async_get_single_flight,
+)
+from custom_components.surepcha.const import (
+    DEFAULT_REQUEST_BURST,
+    DEFAULT_REQUEST_RATE,
+    DEFAULT_TIMEOUT_SETUP,
+    REQUEST_BURST,
+    REQUEST_RATE,
+    TIMEOUT_READ,
+    TIMEOUT_WRITE,
+)
+
+
+async def test_rate_limiter_burst_is_not_delayed() -> None:
+    """Requests within the burst are sent without waiting."""
+    limiter = RateLimiter(rate=1, burst=3)
+
+    for _ in range(3):
+        await limiter.acquire("household")
+
+    assert limiter.as_dict() == {
+        "rate": 1,
+        "burst": 3,
+        "requests": 3,
+        "interactive": 0,
+        "delayed": 0,
+        "wait_total": 0.0,
+        "wait_max": 0.0,
+        "queued": 0,
+    }
+
+
+async def test_rate_limiter_serves_households_round_robin() -> None:
+    """Queued requests alternate between households instead of FIFO."""
+    limiter = RateLimiter(rate=50, burst=1)
+    await limiter.acquire("first")
+    order: list[str] = []
+
+    async def request(key: str, name: str) -> None:
+        await limiter.acquire(key)
+        order.append(name)
+
+    tasks = [
+        asyncio.create_task(request("first", "first-1")),
+        asyncio.create_task(request("first", "first-2")),
+        asyncio.create_task(request("second", "second-1")),
+    ]
+    await asyncio.gather(*tasks)
+
+    assert order == ["first-1", "second-1", "first-2"]
+    assert limiter.delayed == 3
+    assert limiter.wait_max > 0
+
+
+async def test_rate_limiter_serves_interactive_requests_first() -> None:
+    """Interactive requests go first, but background ones still get a share."""
+    limiter = RateLimiter(rate=100, burst=1)
+    await limiter.acquire()
+    order: list[str] = []
+
+    async def request(name: str, interactive: bool) -> None:
+        await limiter.acquire("household", interactive)
+        order.append(name)
+
+    tasks = [asyncio.create_task(request(f"poll-{i}", False)) for i in range(2)]
+    tasks += [
+        asyncio.create_task(request(f"command-{i}", True))
+        for i in range(BACKGROUND_EVERY + 1)
+    ]
+    await asyncio.gather(*tasks)
+
+    assert order == [
+        *(f"command-{i}" for i in range(BACKGROUND_EVERY)),
+        "poll-0",
+        f"command-{BACKGROUND_EVERY}",
+        "poll-1",
+    ]
+    assert limiter.as_dict()["interactive"] == BACKGROUND_EVERY + 1
+
+
+async def test_rate_limiter_skips_cancelled_waiters() -> None:
+    """A cancelled waiter does not consume a token."""
+    limiter = RateLimiter(rate=50, burst=1)
+    await limiter.acquire()
+    cancelled = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    cancelled.cancel()
+
+    await limiter.acquire()
+
+    assert cancelled.cancelled()
+    assert limiter.as_dict()["queued"] == 0
+
+
+async def test_rate_limiter_is_shared_and_configurable(hass: HomeAssistant) -> None:
+    """One limiter is shared per account; options reconfigure it."""
+    limiter = async_get_rate_limiter(hass, "token")
+    assert (limiter.rate, limiter.burst) == (
+        DEFAULT_REQUEST_RATE,
+        DEFAULT_REQUEST_BURST,
+    )
+
+    assert (
+        async_get_rate_limiter(hass, "token", {REQUEST_RATE: 0.5, REQUEST_BURST: 4})
+        is limiter
+    )
+    assert (limiter.rate, limiter.burst) == (0.5, 4)
+
+
+async def test_rate_limiter_per_account(hass: HomeAssistant) -> None:
+    """Accounts have limiters of their own, configured by their own options."""
+    limiter = async_get_rate_limiter(hass, "token", {REQUEST_RATE: 0.5})
+    other = async_get_rate_limiter(hass, "other", {REQUEST_RATE: 5.0})
+
+    assert other is not limiter
+    assert (limiter.rate, other.rate) == (0.5, 5.0)
+
+    client = MagicMock()
+    client.api = AsyncMock(return_value="result")
+    await SurePetcareApi(hass, client, "household", account="other").api("command")
+
+    assert (limiter.requests, other.requests) == (0, 1)
+
+
+async def test_api_requests_go_through_rate_limiter(hass: HomeAssistant) -> None:
+    """SurePetcareApi counts every request on the shared limiter."""
+    client = MagicMock()
+    client.api = AsyncMock(return_value="result")
+    client.token = "token"
+    api = SurePetcareApi(hass, client, "household")
+
+    assert await api.api("command") == "result"
+    assert api.token == "token"
+    client.api.assert_awaited_once_with("command")
+    assert async_get_rate_limiter(hass).requests == 1
+
+
+async def test_single_flight_coalesces_concurrent_calls() -> None:
+    """Concurrent calls for one key share a single underlying call."""
+    single_flight = SingleFlight()
+    release = asyncio.Event()
+    calls = 0
+
+    async def refresh() -> str:
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return "data"
+
+    tasks = [
+        asyncio.create_task(single_flight.run(key, refresh)) for key in (1, 1, 1, 2)
+    ]
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await asyncio.gather(*tasks) == ["data"] * 4
+    assert calls == 2
+    assert single_flight.as_dict() == {"calls": 4, "coalesced": 2, "in_flight": 0}
+
+
+async def test_single_flight_shares_errors_and_starts_fresh() -> None:
+    """A failed call fails every waiter, and the next call is a new request."""
+    single_flight = SingleFlight()
+    refresh = AsyncMock(side_effect=[RuntimeError("offline"), "data"])
+
+    with pytest.raises(RuntimeError):
+        await single_flight.run(1, refresh)
+
+    assert await single_flight.run(1, refresh) == "data"
+    assert single_flight.coalesced == 0
+
+
+async def test_single_flight_survives_cancelled_caller() -> None:
+    """Cancelling one waiter does not cancel the shared call for the others."""
+    single_flight = SingleFlight()
+    release = asyncio.Event()
+
+    async def refresh() -> str:
+        await release.wait()
+        return "data"
+
+    cancelled = asyncio.create_task(single_flight.run(1, refresh))
+    waiting = asyncio.create_task(single_flight.run(1, refresh))
+    await asyncio.sleep(0)
+    cancelled.cancel()
+    release.set()
+
+    assert await waiting == "data"
+    assert cancelled.cancelled()
+
+
+async def test_api_refresh_is_single_flight(hass: HomeAssistant) -> None:
+    """Concurrent refreshes of a device through the api send one request."""
+    client = MagicMock()
+    client.api = AsyncMock(return_value=None)
+    device = MagicMock(id=1)
+    api = SurePetcareApi(hass, client)
+
+    await asyncio.gather(api.refresh(device), api.refresh(device))
+
+    client.api.assert_awaited_once_with(device.refresh.return_value)
+    assert async_get_single_flight(hass).coalesced == 1
+
+
+async def test_api_refresh_is_per_device_object(hass: HomeAssistant) -> None:
+    """Objects sharing an id are each refreshed, as each is updated in place."""
+    client = MagicMock()
+    client.api = AsyncMock(return_value=None)
+    first, second = MagicMock(id=1), MagicMock(id=1)
+    api = SurePetcareApi(hass, client)
+
+    await asyncio.gather(api.refresh(first), api.refresh(second))
+
+    assert client.api.await_count == 2
+    assert async_get_single_flight(hass).coalesced == 0
+
+
+async def test_client_pool_shares_client_per_token() -> None:
+    """Entries of one account share a client, closed after the last release."""
+    pool = ClientPool()
+    client = MagicMock()
+    client.close = AsyncMock()
+    login = AsyncMock(return_value=client)
+
+    first, second = await asyncio.gather(
+        pool.acquire("token", login), pool.acquire("token", login)
+    )
+
+    assert first is second is client
+    login.assert_awaited_once()
+    await pool.release("token")
+    client.close.assert_not_awaited()
+    await pool.release("token")
+    client.close.assert_awaited_once()
+    assert pool.as_dict() == {"accounts": 0, "users": 0, "logins": 1}
+
+
+async def test_client_pool_retries_failed_login() -> None:
+    """A failed login is not cached, the next acquire logs in again."""
+    pool = ClientPool()
+    client = MagicMock()
+    login = AsyncMock(side_effect=[RuntimeError("denied"), client])
+
+    with pytest.raises(RuntimeError):
+        await pool.acquire("token", login)
+
+    assert await pool.acquire("token", login) is client
+    assert pool.as_dict() == {"accounts": 1, "users": 1, "logins": 2}
+
+
+async def test_api_many_sends_commands_concurrently(hass: HomeAssistant) -> None:
+    """Independent commands are sent concurrently, within the limit."""
+    running = 0
+    most_running = 0
+
+    async def send(command: str) -> str:
+        nonlocal running, most_running
+        running += 1
+        most_running = max(most_running, running)
+        await asyncio.sleep(0)
+        running -= 1
+        return command.upper()
+
+    client = MagicMock()
+    client.api = AsyncMock(side_effect=send)
+    api = SurePetcareApi(hass, client, "household")
+
+    assert await api.api_many(["a", "b", "c"], limit=2) == ["A", "B", "C"]
+    assert most_running == 2
+
+
+async def test_api_sends_command_lists_in_order(hass: HomeAssistant) -> None:
+    """A list of commands is sent one after another, like the library does."""
+    running = 0
+    sent = []
+
+    async def send(command: str) -> str:
+        nonlocal running
+        running += 1
+        assert running == 1
+        await asyncio.sleep(0)
+        sent.append(command)
+        running -= 1
+        return command.upper()
+
+    client = MagicMock()
+    client.api = AsyncMock(side_effect=send)
+    api = SurePetcareApi(hass, client, "household")
+
+    assert await api.api(["d", "e", "f"]) == ["D", "E", "F"]
+    assert sent == ["d", "e", "f"]
+
+
+async def test_api_reports_partial_failures(hass: HomeAssistant) -> None:
+    """A failed command does not hide the ones that were sent."""
+
+    async def send(command: str) -> str:
+        if command == "b":
+            raise RuntimeError("flap offline")
+        return command.upper()
+
+    client = MagicMock()
+    client.api = AsyncMock(side_effect=send)
+    api = SurePetcareApi(hass, client, "household")
+
+    with pytest.raises(CommandsFailed, match="1 of 3 commands failed") as err:
+        await api.api_many(["a", "b", "c"])
+
+    assert client.api.await_count == 3
+    assert err.value.results[0] == "A"
+    assert err.value.results[2] == "C"
+    assert [command for command, _ in err.value.failed] == ["b"]
+
+
+async def test_api_enforces_deadlines(hass: HomeAssistant) -> None:
+    """A request running past its kind's deadline is cancelled and counted."""
+    cancelled = asyncio.Event()
+
+    async def hang(command: str) -> None:
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    client = MagicMock()
+    client.api = AsyncMock(side_effect=hang)
+    api = SurePetcareApi(
+        hass, client, "household", {TIMEOUT_WRITE: 0.01, TIMEOUT_READ: 5}
+    )
+
+    with pytest.raises(TimeoutError):
+        await api.api("command", WRITE)
+
+    assert cancelled.is_set()
+    assert api.timeouts.as_dict() == {
+        READ: 5,
+        WRITE: 0.01,
+        SETUP: DEFAULT_TIMEOUT_SETUP,
+        "timed_out": {"write str": 1},
+    }
@@ -0,0 +1,172 @@
+import asyncio
+from datetime import timedelta
+from typing import Any
+from unittest.mock import AsyncMock
+
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+
+from custom_components.surepcha.commands import CommandQueue, affected_ids
+from custom_components.surepcha.const import DOMAIN
+
+
+def _queue(
+    hass: HomeAssistant,
+    send_control: AsyncMock,
+    on_sent: AsyncMock | None = None,
+    max_depth: int = 10,
+) -> CommandQueue:
+    return CommandQueue(
+        hass,
+        MockConfigEntry(domain=DOMAIN),
+        "feeder",
+        1,
+        max_depth,
+        send_control,
+        on_sent or AsyncMock(),
+    )
+
+
+async def _flush(hass: HomeAssistant, delay: float) -> None:
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=delay))
+    await hass.async_block_till_done()
+
+
+async def test_command_queue_merges_writes(hass: HomeAssistant) -> None:
+    """Queued writes are merged into one request and newer writes replace older."""
+    send = AsyncMock(return_value="ok")
+    on_sent = AsyncMock()
+    queue = _queue(hass, send, on_sent)
+
+    futures = [
+        queue.write(
+            {"control": {"bowls": {"settings": [{"target": 10}]}}},
+            [("control.bowls.settings.0.target", 10)],
+        ),
+        queue.write(
+            {"control": {"bowls": {"settings": [None, {"target": 20}]}}},
+            [("control.bowls.settings.1.target", 20)],
+        ),
+        queue.write(
+            {"control": {"bowls": {"settings": [{"target": 15}]}}},
+            [("control.bowls.settings.0.target", 15)],
+        ),
+    ]
+    assert queue.depth == 2
+    await asyncio.sleep(0)
+    send.assert_not_awaited()
+    await _flush(hass, 1)
+
+    assert await asyncio.gather(*futures) == ["ok"] * 3
+    send.assert_awaited_once_with(
+        {"control": {"bowls": {"settings": [{"target": 15}, {"target": 20}]}}}
+    )
+    on_sent.assert_awaited_once_with(
+        [
+            ("control.bowls.settings.1.target", 20),
+            ("control.bowls.settings.0.target", 15),
+        ]
+    )
+    assert queue.as_dict() == {
+        "control_payloads": 3,
+        "control_requests": 1,
+        "queue_depth": 0,
+        "queue_max_depth": 2,
+        "queued": 3,
+        "superseded": 1,
+        "rejected": 0,
+        "failed": 0,
+    }
+
+
+async def test_command_queue_keeps_order(hass: HomeAssistant) -> None:
+    """Commands are sent one at a time in the order they were queued."""
+    sent: list[str] = []
+    send = AsyncMock(side_effect=lambda payload: sent.append("control"))
+    queue = _queue(hass, send)
+
+    queue.call(AsyncMock(side_effect=lambda: sent.append("first")))
+    queue.write({"control": {"locking": 1}})
+    queue.call(AsyncMock(side_effect=lambda: sent.append("last")))
+    await asyncio.sleep(0)
+    await _flush(hass, 1)
+
+    assert sent == ["first", "control", "last"]
+
+
+async def test_command_queue_rejects_when_full(hass: HomeAssistant) -> None:
+    """Commands beyond the maximum depth are rejected, replacing ones are not."""
+    queue = _queue(hass, AsyncMock(), max_depth=1)
+
+    queue.write({"control": {"locking": 1}}, [("control.locking", 1)])
+    queue.write({"control": {"locking": 2}}, [("control.locking", 2)])
+    with pytest.raises(HomeAssistantError):
+        queue.call(AsyncMock())
+
+    assert queue.as_dict()["rejected"] == 1
+    queue.async_shutdown()
+
+
+async def test_command_queue_shares_errors(hass: HomeAssistant) -> None:
+    """Every caller of a failed merged request gets the error."""
+    queue = _queue(hass, AsyncMock(side_effect=RuntimeError("offline")))
+
+    futures = [queue.write({"control": {key: 1}}) for key in ("a", "b")]
+    await asyncio.sleep(0)
+    await _flush(hass, 1)
+
+    for future in futures:
+        with pytest.raises(RuntimeError):
+            await future
+    assert queue.as_dict()["failed"] == 1
+
+
+async def test_command_queue_shutdown_cancels_pending(hass: HomeAssistant) -> None:
+    """Unloading cancels the commands still waiting in the queue."""
+    send = AsyncMock()
+    queue = _queue(hass, send)
+
+    future = queue.write({"control": {"locking": 1}})
+    await asyncio.sleep(0)
+    queue.async_shutdown()
+    await hass.async_block_till_done()
+
+    assert future.cancelled()
+    send.assert_not_awaited()
+    assert queue.depth == 0
+
+
+async def test_command_queue_shutdown_cancels_command_being_sent(
+    hass: HomeAssistant,
+) -> None:
+    """Unloading while a command is sent cancels the futures waiting for it."""
+    started = asyncio.Event()
+
+    async def slow_send(payload: dict[str, Any]) -> None:
+        started.set()
+        await asyncio.Event().wait()
+
+    queue = _queue(hass, AsyncMock(side_effect=slow_send))
+    write = queue.write({"control": {"locking": 1}})
+    call = queue.call(AsyncMock())
+    await asyncio.wait_for(started.wait(), 5)
+
+    queue.async_shutdown()
+    await hass.async_block_till_done()
+
+    assert write.cancelled()
+    assert call.cancelled()
+    assert queue.depth == 0
+
+
+def test_affected_ids() -> None:
+    """Only the roles whose state a command changes are refreshed."""
+    assert affected_ids("set_profile", pet=[1], device=[2, 3]) == {"1", "2", "3"}
+    assert affected_ids("set_position", pet=[1], device=[2]) == {"1"}
+    assert affected_ids("unknown", pet=[1], device=[2]) == {"1", "2"}
@@ -29,6 +29,9 @@ from custom_components.surepcha.const import (
     OPTION_PROPERTIES,
     POLLING_SPEED,
     PRODUCT_ID,
+    REQUEST_RATE,
+    SNAPSHOT_CACHE,
+    TIMEOUT_WRITE,
     TOKEN,
 )
 
@@ -97,7 +100,7 @@ async def test_options_flow(hass: HomeAssistant, mock_config_entry):
     result = await flow.async_step_init()
     assert result["type"] == FlowResultType.MENU
     assert result["step_id"] == "init"
-    assert result["menu_options"] == ["manual_properties", "devices"]
+    assert result["menu_options"] == ["manual_properties", "devices", "settings"]
 
     result2 = await flow.async_step_manual_properties()
     assert result2["type"] == FlowResultType.FORM
@@ -293,7 +296,7 @@ async def test_options_flow_full(
     result = await flow.async_step_init()
     assert result["type"] == "menu"
     assert result["step_id"] == "init"
-    assert result["menu_options"] == ["manual_properties", "devices"]
+    assert result["menu_options"] == ["manual_properties", "devices", "settings"]
 
     assert helper_fetch_area_options(area_registry) == [
         {"value": "kitchen", "label": "Kitchen"},
@@ -323,6 +326,34 @@ async def test_options_flow_full(
     assert mock_config_entry == snapshot
 
 
+@pytest.mark.usefixtures("mock_surepetcare_login_control", "enable_custom_integrations")
+async def test_options_flow_settings(mock_config_entry, hass: HomeAssistant):
+    """The settings step stores each section's values at the top level."""
+    mock_config_entry.add_to_hass(hass)
+    flow = SurePetCareOptionsFlow(mock_config_entry)
+    flow.hass = hass
+
+    result = await flow.async_step_settings()
+    assert result["type"] == FlowResultType.FORM
+    assert result["step_id"] == "settings"
+    assert set(result["data_schema"].schema) == {"polling", "requests", "commands"}
+
+    result = await flow.async_step_settings(
+        {
+            "polling": {SNAPSHOT_CACHE: False},
+            "requests": {REQUEST_RATE: 1.0, TIMEOUT_WRITE: 90},
+            "commands": {},
+        }
+    )
+
+    assert result["type"] == FlowResultType.CREATE_ENTRY
+    assert result["data"][SNAPSHOT_CACHE] is False
+    assert result["data"][REQUEST_RATE] == 1.0
+    assert result["data"][TIMEOUT_WRITE] == 90
+    assert "polling" not in result["data"]
+    assert result["data"][OPTION_DEVICES] == mock_config_entry.options[OPTION_DEVICES]
+
+
 @pytest.mark.asyncio
 async def test_async_migrate_entry_adds_manual_properties(
     hass: HomeAssistant, snapshot: SnapshotAssertion
@@ -516,7 +547,7 @@ async def test_reconfigure_legacy_no_household_id(hass: HomeAssistant) -> None:
     legacy_entry = MockConfigEntry(
         domain=DOMAIN,
         data={TOKEN: "tok", CLIENT_DEVICE_ID: "dev"},  # no HOUSEHOLD_ID
-        options={OPTION_DEVICES: {}, OPTION_PROPERTIES: {}},
+        options={OPTION_DEVICES: {}, OPTION_PROPERTIES: {}, REQUEST_RATE: 1.0},
         unique_id="legacy",
     )
     legacy_entry.add_to_hass(hass)
@@ -530,6 +561,7 @@ async def test_reconfigure_legacy_no_household_id(hass: HomeAssistant) -> None:
     assert result["type"] is FlowResultType.ABORT
     assert result["reason"] == "entities_reconfigured"
     assert legacy_entry.data[HOUSEHOLD_ID] == 12345
+    assert legacy_entry.options[REQUEST_RATE] == 1.0
 
 
 @pytest.mark.asyncio
@@ -675,6 +707,24 @@ async def test_authenticate_login_failed() -> None:
     assert errors["base"] == "auth_failed"
 
 
+@pytest.mark.asyncio
+async def test_authenticate_uses_account_rate_limiter() -> None:
+    """Requests of the flow wait for the rate limiter of the account."""
+    flow = SurePetCareConfigFlow()
+    client = MagicMock()
+    client.token = "tok"
+    client.login = AsyncMock(return_value=True)
+
+    with patch(
+        "custom_components.surepcha.config_flow.SurePetcareClient",
+        return_value=client,
+    ):
+        api, errors = await flow._authenticate(email="a@b.com", password="pw")
+
+    assert not errors
+    assert api.account == "tok"
+
+
 def test_async_get_options_flow(mock_config_entry) -> None:
     """async_get_options_flow returns a SurePetCareOptionsFlow instance."""
     result = SurePetCareConfigFlow.async_get_options_flow(mock_config_entry)
@@ -0,0 +1,501 @@
+import asyncio
+from collections.abc import Callable
+from datetime import timedelta
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import STATE_UNAVAILABLE
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.update_coordinator import UpdateFailed
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+from surepcio import SurePetcareClient
+from surepcio.devices.device import DeviceBase, PetBase
+
+from custom_components.surepcha.api import SurePetcareApi
+from custom_components.surepcha.const import (
+    BACKGROUND_SETUP,
+    DEFAULT_COMMAND_REFRESH_DELAY,
+    HOUSEHOLD_POLLING,
+    OPTIMISTIC_UPDATES,
+    OPTION_DEVICES,
+    POLLING_SPEED,
+    SCAN_INTERVAL,
+)
+from custom_components.surepcha.coordinator import (
+    SurePetCareDeviceDataUpdateCoordinator,
+    SurePetCareHouseholdDataUpdateCoordinator,
+)
+from custom_components.surepcha.method_field import MethodField
+from custom_components.surepcha.polling import CircuitBreaker
+
+from . import initialize_entry
+
+
+def _mock_device_coordinator(
+    device_id: int, error: Exception | None = None
+) -> MagicMock:
+    coordinator = MagicMock()
+    coordinator.name = f"device {device_id}"
+    coordinator._device.id = device_id
+    coordinator.async_fetch = AsyncMock(side_effect=error)
+    return coordinator
+
+
+@pytest.mark.usefixtures("enable_custom_integrations")
+async def test_household_polling_hands_data_to_devices(
+    hass: HomeAssistant,
+    mock_client: SurePetcareClient,
+    entry_with_options: Callable[..., MockConfigEntry],
+    mock_devices: list[DeviceBase],
+    mock_pets: list[PetBase],
+) -> None:
+    """Device coordinators only get data pushed from the household coordinator."""
+    entry = entry_with_options(**{HOUSEHOLD_POLLING: True})
+    await initialize_entry(hass, mock_client, entry, mock_devices, mock_pets)
+
+    for coordinator in entry.runtime_data:
+        assert coordinator.update_interval is None
+        assert coordinator.data is coordinator._device
+        assert coordinator.last_update_success
+
+
+@pytest.mark.usefixtures("enable_custom_integrations")
+async def test_household_polling_keeps_faster_device_override(
+    hass: HomeAssistant,
+    mock_client: SurePetcareClient,
+    mock_config_entry: MockConfigEntry,
+    entry_with_options: Callable[..., MockConfigEntry],
+    mock_devices: list[DeviceBase],
+    mock_pets: list[PetBase],
+) -> None:
+    """A polling_speed below the household interval keeps the device's own timer."""
+    devices = {
+        device_id: {**device, POLLING_SPEED: 30} if device_id == "269654" else device
+        for device_id, device in mock_config_entry.options[OPTION_DEVICES].items()
+    }
+    entry = entry_with_options(**{HOUSEHOLD_POLLING: True, OPTION_DEVICES: devices})
+    await initialize_entry(hass, mock_client, entry, mock_devices, mock_pets)
+
+    intervals = {str(c._device.id): c.poll_interval for c in entry.runtime_data}
+    assert intervals.pop("269654") == 30
+    assert set(intervals.values()) == {None}
+
+
+async def test_household_refresh_marks_failed_device(
+    hass: HomeAssistant, mock_config_entry: MockConfigEntry
+) -> None:
+    """A failing device is flagged on its own coordinator, others get their data."""
+    error = RuntimeError("offline")
+    ok = _mock_device_coordinator(1)
+    failing = _mock_device_coordinator(2, error)
+    household = SurePetCareHouseholdDataUpdateCoordinator(
+        hass, mock_config_entry, SurePetcareApi(hass, MagicMock()), [ok, failing], 300
+    )
+    household.data = {}
+
+    await household.async_refresh()
+    household.async_update_devices()
+
+    assert household.data == {1: ok._device}
+    failing.async_set_update_error.assert_called_once_with(error)
+    ok.async_set_updated_data.assert_called_once_with(ok._device)
+    failing.async_set_updated_data.assert_not_called()
+
+
+async def test_household_first_refresh_requires_every_device(
+    hass: HomeAssistant, mock_config_entry: MockConfigEntry
+) -> None:
+    """The blocking first refresh fails if any device fails, like per-device setup."""
+    mock_config_entry.add_to_hass(hass)
+    mock_config_entry.mock_state(hass, ConfigEntryState.SETUP_IN_PROGRESS)
+    household = SurePetCareHouseholdDataUpdateCoordinator(
+        hass,
+        mock_config_entry,
+        SurePetcareApi(hass, MagicMock()),
+        [_mock_device_coordinator(1), _mock_device_coordinator(2, RuntimeError())],
+        300,
+    )
+
+    with pytest.raises(ConfigEntryNotReady):
+        await household.async_config_entry_first_refresh()
+
+    assert household.data is None
+
+
+async def test_household_background_first_refresh_hands_out_devices(
+    hass: HomeAssistant, mock_config_entry: MockConfigEntry
+) -> None:
+    """Without setup waiting, a failing device does not hold back the others."""
+    error = RuntimeError("offline")
+    ok = _mock_device_coordinator(1)
+    failing = _mock_device_coordinator(2, error)
+    household = SurePetCareHouseholdDataUpdateCoordinator(
+        hass, mock_config_entry, SurePetcareApi(hass, MagicMock()), [ok, failing], 300
+    )
+
+    await household.async_refresh()
+    household.async_update_devices()
+
+    assert household.last_update_success
+    assert household.data == {1: ok._device}
+    failing.async_set_update_error.assert_called_once_with(error)
+    ok.async_set_updated_data.assert_called_once_with(ok._device)
+
+
+@pytest.mark.usefixtures("enable_custom_integrations")
+async def test_device_coordinators_poll_on_separate_phases(
+    hass: HomeAssistant,
+    mock_client: SurePetcareClient,
+    mock_config_entry: MockConfigEntry,
+    mock_devices: list[DeviceBase],
+    mock_pets: list[PetBase],
+) -> None:
+    """Coordinators share the poll interval but not the moment they poll."""
+    await initialize_entry(
+        hass, mock_client, mock_config_entry, mock_devices, mock_pets
+    )
+    coordinators = {str(c._device.id): c for c in mock_config_entry.runtime_data}
+
+    assert {c.poll_interval for c in coordinators.values()} == {SCAN_INTERVAL}
+    assert len({c.phase for c in coordinators.values()}) == len(coordinators)
+    for coordinator in coordinators.values():
+        assert 0 < coordinator.update_interval.total_seconds() <= SCAN_INTERVAL + 5
+
+
+@pytest.mark.usefixtures("enable_custom_integrations")
+async def test_device_coordinator_skips_unchanged_updates(
+    hass: HomeAssistant,
+    mock_client: SurePetcareClient,
+    mock_config_entry: MockConfigEntry,
+    mock_devices: list[DeviceBase],
+    mock_pets: list[PetBase],
+) -> None:
+    """Listeners are only notified when the data or availability changes."""
+    await initialize_entry(
+        hass, mock_client, mock_config_entry, mock_devices, mock_pets
+    )
+    coordinator = mock_config_entry.runtime_data[0]
+    listener = MagicMock()
+    coordinator.async_add_listener(listener)
+
+    coordinator.async_set_updated_data(coordinator._device)
+    assert listener.call_count == 0
+
+    coordinator.async_set_update_error(RuntimeError("offline"))
+    assert listener.call_count == 1
+    coordinator.async_set_updated_data(coordinator._device)
+    assert listener.call_count == 2
+
+    with patch("custom_components.surepcha.coordinator.fingerprint", return_value=0):
+        coordinator.async_set_updated_data(coordinator._device)
+    assert listener.call_count == 3
+
+
+@pytest.mark.usefixtures("enable_custom_integrations")
+async def test_background_setup_refreshes_after_entities_exist(
+    hass: HomeAssistant,
+    entity_registry: er.EntityRegistry,
+    mock_client: SurePetcareClient,
+    entry_with_options: Callable[..., MockConfigEntry],
+    mock_devices: list[DeviceBase],
+    mock_pets: list[PetBase],
+) -> None:
+    """Setup finishes before the first refresh; entities wait unavailable."""
+    entry = entry_with_options(**{BACKGROUND_SETUP: True})
+    release = asyncio.Event()
+
+    async def refresh_when_released(self):
+        await release.wait()
+        return self._device
+
+    with patch(
+        "custom_components.surepcha.coordinator."
+        "SurePetCareDeviceDataUpdateCoordinator._async_update_data",
+        new=refresh_when_released,
+    ):
+        await initialize_entry(hass, mock_client, entry, mock_devices, mock_pets)
+        entity_ids = [
+            e.entity_id
+            for e in er.async_entries_for_config_entry(entity_registry, entry.entry_id)
+            if hass.states.get(e.entity_id) is not None
+        ]
+        assert entity_ids
+        assert {hass.states.get(e).state for e in entity_ids} == {STATE_UNAVAILABLE}
+
+        release.set()
+        await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert all(c.last_update_success for c in entry.runtime_data)
+    assert {hass.states.get(e).state for e in entity_ids} != {STATE_UNAVAILABLE}
+
+
+async def test_device_refresh_circuit_breaker(
+    hass: HomeAssistant, mock_config_entry: MockConfigEntry
+) -> None:
+    """Repeated failures open the breaker, which then skips requests."""
+    client = MagicMock()
+    client.api = AsyncMock(side_effect=RuntimeError("offline"))
+    device = MagicMock(id=1)
+    device.name = "feeder"
+    coordinator = SurePetCareDeviceDataUpdateCoordinator(
+        hass, mock_config_entry, SurePetcareApi(hass, client), device
+    )
+
+    for _ in range(coordinator.breaker.threshold):
+        with pytest.raises(RuntimeError):
+            await coordinator.async_fetch()
+    with pytest.raises(UpdateFailed):
+        await coordinator.async_fetch()
+
+    assert client.api.await_count == coordinator.breaker.threshold
+    assert coordinator.breaker.state == CircuitBreaker.OPEN
+    assert coordinator._poll_delay(hass.loop.time()) > SCAN_INTERVAL / 2
+
+
+async def test_command_refreshes_are_debounced(
+    hass: HomeAssistant, mock_config_entry: MockConfigEntry
+) -> None:
+    """A burst of commands is followed by a single refresh."""
+    coordinator = SurePetCareDeviceDataUpdateCoordinator(
+        hass, mock_config_entry, SurePetcareApi(hass, MagicMock()), MagicMock(id=1)
+    )
+
+    for _ in range(4):
+        await coordinator.async_request_command_refresh()
+    async_fire_time_changed(
+        hass, dt_util.utcnow() + timedelta(seconds=DEFAULT_COMMAND_REFRESH_DELAY)
+    )
+    await hass.async_block_till_done()
+
+    diagnostics = coordinator.command_diagnostics()
+    assert diagnostics["refresh_requests"] == 4
+    assert diagnostics["refreshes"] == 1
+    assert diagnostics["refreshes_saved"] == 3
+    await coordinator.async_shutdown()
+
+
+async def test_command_refresh_goes_ahead_of_polls(
+    hass: HomeAssistant, mock_config_entry: MockConfigEntry
+) -> None:
+    """Only the refresh after a command is interactive, not a poll meanwhile."""
+    coordinator = SurePetCareDeviceDataUpdateCoordinator(
+        hass, mock_config_entry, SurePetcareApi(hass, MagicMock()), MagicMock(id=1)
+    )
+    release = asyncio.Event()
+
+    async def refresh(device: Any, interactive: bool) -> None:
+        await release.wait()
+
+    coordinator.client.refresh = AsyncMock(side_effect=refresh)
+    with patch("custom_components.surepcha.coordinator.fingerprint", return_value=0):
+        command = hass.async_create_task(coordinator._async_command_refresh())
+        poll = hass.async_create_task(coordinator.async_refresh())
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(command, poll)
+
+    assert [call.args[1] for call in coordinator.client.refresh.await_args_list] == [
+        True,
+        False,
+    ]
+    await coordinator.async_shutdown()
+
+
+async def test_optimistic_value_is_reconciled_by_refresh(
+    hass: HomeAssistant,
+    entry_with_options: Callable[..., MockConfigEntry],
+) -> None:
+    """A written value shows right away and the next refresh has the last word."""
+    device = MagicMock(id=1)
+    device.control = SimpleNamespace(lid=SimpleNamespace(close_delay=0))
+    client = MagicMock()
+    client.api = AsyncMock(
+        side_effect=lambda _: setattr(device.control.lid, "close_delay", 0)
+    )
+    entry = entry_with_options(**{OPTIMISTIC_UPDATES: True})
+    coordinator = SurePetCareDeviceDataUpdateCoordinator(
+        hass, entry, SurePetcareApi(hass, client), device
+    )
+    coordinator.data = device
+    listener = MagicMock()
+    coordinator.async_add_listener(listener)
+
+    coordinator.async_apply_optimistic([("control.lid.close_delay", 4)])
+
+    assert device.control.lid.close_delay == 4
+    listener.assert_called_once()
+    assert coordinator.command_diagnostics()["optimistic_pending"] == 1
+
+    await coordinator.async_fetch()
+
+    assert device.control.lid.close_delay == 0
+    assert coordinator.command_diagnostics()["optimistic_pending"] == 0
+    assert coordinator.command_diagnostics()["optimistic_rollbacks"] == 1
+    await coordinator.async_shutdown()
+
+
+async def test_optimistic_value_is_rolled_back_if_sending_fails(
+    hass: HomeAssistant,
+    entry_with_options: Callable[..., MockConfigEntry],
+) -> None:
+    """A value shown while the command was queued is undone when it fails."""
+    device = MagicMock(id=1)
+    device.control = SimpleNamespace(lid=SimpleNamespace(close_delay=0))
+    entry = entry_with_options(**{OPTIMISTIC_UPDATES: True})
+    coordinator = SurePetCareDeviceDataUpdateCoordinator(
+        hass, entry, SurePetcareApi(hass, MagicMock()), device
+    )
+    coordinator.data = device
+    sent: asyncio.Future[None] = hass.loop.create_future()
+
+    coordinator.async_apply_optimistic([("control.lid.close_delay", 4)], sent)
+    assert device.control.lid.close_delay == 4
+
+    sent.set_exception(TimeoutError())
+    await hass.async_block_till_done()
+
+    assert device.control.lid.close_delay == 0
+    assert coordinator.command_diagnostics()["optimistic_pending"] == 0
+    assert coordinator.command_diagnostics()["optimistic_rollbacks"] == 1
+    await coordinator.async_shutdown()
+
+
+async def test_optimistic_rollback_skips_superseded_write(
+    hass: HomeAssistant,
+    entry_with_options: Callable[..., MockConfigEntry],
+) -> None:
+    """A failed command restores the value sent last, not an unsent one."""
+    device = MagicMock(id=1)
+    device.control = SimpleNamespace(lid=SimpleNamespace(close_delay=0))
+    entry = entry_with_options(**{OPTIMISTIC_UPDATES: True})
+    coordinator = SurePetCareDeviceDataUpdateCoordinator(
+        hass, entry, SurePetcareApi(hass, MagicMock()), device
+    )
+    coordinator.data = device
+    # The second write supersedes the first, both share the failed request.
+    first: asyncio.Future[None] = hass.loop.create_future()
+    second: asyncio.Future[None] = hass.loop.create_future()
+
+    coordinator.async_apply_optimistic([("control.lid.close_delay", 4)], first)
+    coordinator.async_apply_optimistic([("control.lid.close_delay", 8)], second)
+    assert device.control.lid.close_delay == 8
+
+    first.set_exception(TimeoutError())
+    second.set_exception(TimeoutError())
+    await hass.async_block_till_done()
+
+    assert device.control.lid.close_delay == 0
+    assert coordinator.command_diagnostics()["optimistic_pending"] == 0
+    await coordinator.async_shutdown()
+
+
+async def test_optimistic_rollback_keeps_sent_value(
+    hass: HomeAssistant,
+    entry_with_options: Callable[..., MockConfigEntry],
+) -> None:
+    """A failed command restores the value of the command sent before it."""
+    device = MagicMock(id=1)
+    device.control = SimpleNamespace(lid=SimpleNamespace(close_delay=0))
+    entry = entry_with_options(**{OPTIMISTIC_UPDATES: True})
+    coordinator = SurePetCareDeviceDataUpdateCoordinator(
+        hass, entry, SurePetcareApi(hass, MagicMock()), device
+    )
+    coordinator.data = device
+    first: asyncio.Future[None] = hass.loop.create_future()
+    second: asyncio.Future[None] = hass.loop.create_future()
+
+    coordinator.async_apply_optimistic([("control.lid.close_delay", 4)], first)
+    first.set_result(None)
+    await hass.async_block_till_done()
+    coordinator.async_apply_optimistic([("control.lid.close_delay", 8)], second)
+    second.set_exception(TimeoutError())
+    await hass.async_block_till_done()
+
+    assert device.control.lid.close_delay == 4
+    await coordinator.async_shutdown()
+
+
+@pytest.mark.usefixtures("enable_custom_integrations")
+async def test_field_context_is_shared_until_update(
+    hass: HomeAssistant,
+    mock_client: SurePetcareClient,
+    mock_config_entry: MockConfigEntry,
+    mock_devices: list[DeviceBase],
+    mock_pets: list[PetBase],
+) -> None:
+    """Entities share one context per update and one options view per change."""
+    await initialize_entry(
+        hass, mock_client, mock_config_entry, mock_devices, mock_pets
+    )
+    coordinator = mock_config_entry.runtime_data[0]
+    other = mock_config_entry.runtime_data[1]
+
+    context = coordinator.field_context
+    generation = coordinator.generation
+    assert coordinator.field_context is context
+    assert coordinator.generation == generation
+    assert other.field_context.options is context.options
+    assert context.writes == []
+
+    with patch("custom_components.surepcha.coordinator.fingerprint", return_value=0):
+        coordinator.async_set_updated_data(coordinator._device)
+    updated = coordinator.field_context
+    assert updated is not context
+    assert updated.options is context.options
+    assert coordinator.generation == generation + 1
+
+    devices = {**mock_config_entry.options[OPTION_DEVICES], "999": {}}
+    hass.config_entries.async_update_entry(
+        mock_config_entry,
+        options={**mock_config_entry.options, OPTION_DEVICES: devices},
+    )
+    assert coordinator.field_context.options is not context.options
+    assert coordinator.field_context.options[OPTION_DEVICES] == devices
+
+
+@pytest.mark.usefixtures("enable_custom_integrations")
+async def test_fields_are_evaluated_once_per_update(
+    hass: HomeAssistant,
+    mock_client: SurePetcareClient,
+    mock_config_entry: MockConfigEntry,
+    mock_devices: list[DeviceBase],
+    mock_pets: list[PetBase],
+) -> None:
+    """Registered fields are evaluated together and read from the table."""
+    await initialize_entry(
+        hass, mock_client, mock_config_entry, mock_devices, mock_pets
+    )
+    coordinator = mock_config_entry.runtime_data[0]
+    get_fn = MagicMock(return_value=3)
+    get_fn.__name__ = "get_fn"
+    field = MethodField(get_fn=get_fn)
+    failing = MethodField(get_fn=MagicMock(side_effect=RuntimeError("broken")))
+    remove = coordinator.async_register_field("value", field)
+    coordinator.async_register_field("failing", failing)
+
+    with patch("custom_components.surepcha.coordinator.fingerprint", return_value=0):
+        coordinator.async_set_updated_data(coordinator._device)
+    assert get_fn.call_count == 1
+
+    values = coordinator.field_values("value", field)
+    assert values.value == 3
+    assert values.extra is None
+    assert values.picture is None
+    assert coordinator.field_values("value", field) is values
+    assert get_fn.call_count == 1
+    with pytest.raises(RuntimeError, match="broken"):
+        _ = coordinator.field_values("failing", failing).value
+
+    remove()
+    with patch("custom_components.surepcha.coordinator.fingerprint", return_value=1):
+        coordinator.async_set_updated_data(coordinator._device)
+    assert get_fn.call_count == 1
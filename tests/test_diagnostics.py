@@ -49,8 +49,12 @@ async def test_entry_diagnostics(
     assert OPTION_PROPERTIES in result["options"]
     assert isinstance(result["options"][OPTION_PROPERTIES], dict)
 
+    # Entities read their cached values while being added, so both are counted.
+    assert result["cache"]["misses"] > 0
+    assert result["cache"]["hits"] >= 0
+
     assert result == snapshot(
-        exclude=props("last_changed", "last_reported", "last_updated")
+        exclude=props("last_changed", "last_reported", "last_updated", "hits", "misses")
     )
 
 
@@ -0,0 +1,77 @@
+"""Tests for helper module."""
+
+from datetime import UTC, datetime
+from enum import Enum
+from types import SimpleNamespace
+
+import pytest
+from pydantic import BaseModel
+
+from custom_components.surepcha.helper import _serialize_reflective, serialize
+
+
+class Color(Enum):
+    RED = 1
+
+
+class Bowl(BaseModel):
+    color: Color
+    weight: float | None = None
+
+
+class Reading:
+    unit = "g"
+
+    def __init__(self) -> None:
+        self.value = 12
+        self._raw = b"12"
+        self.at = datetime(2024, 1, 1, tzinfo=UTC)
+        self.bowls = (Bowl(color=Color.RED),)
+
+    @property
+    def color(self) -> Color:
+        return Color.RED
+
+    @property
+    def formatter(self):
+        return str
+
+    def method(self) -> None:
+        """Not serialized."""
+
+    @staticmethod
+    def helper() -> None:
+        """Not serialized."""
+
+
+class TestSerialize:
+    """Test serialize."""
+
+    @pytest.mark.parametrize(
+        "obj",
+        [
+            None,
+            3,
+            "text",
+            Color.RED,
+            datetime(2024, 1, 1, tzinfo=UTC),
+            {"key": [Color.RED, (1, 2)]},
+            Bowl(color=Color.RED, weight=2.5),
+            Reading(),
+            [Reading(), {"reading": Reading()}],
+            SimpleNamespace(a=1, b=Color.RED),
+        ],
+    )
+    def test_matches_reflection(self, obj):
+        """Planned serialization gives the output of reading every attribute."""
+        assert serialize(obj) == _serialize_reflective(obj)
+
+    def test_object(self):
+        """Public attributes and properties are kept, methods left out."""
+        assert serialize(Reading()) == {
+            "value": 12,
+            "at": "2024-01-01 00:00:00+00:00",
+            "bowls": [{"color": "RED", "weight": None}],
+            "color": "RED",
+            "unit": "g",
+        }
@@ -4,9 +4,11 @@ from typing import ClassVar
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
+from aiohttp import ClientError
 from homeassistant.config_entries import ConfigEntryState
 from homeassistant.const import EVENT_HOMEASSISTANT_STOP
 from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ConfigEntryAuthFailed, ConfigEntryNotReady
 from homeassistant.helpers import device_registry as dr
 from homeassistant.helpers import entity_registry as er
 from pytest_homeassistant_custom_component.common import MockConfigEntry
@@ -255,7 +257,18 @@ def patch_dummy_client_api(monkeypatch):
     monkeypatch.setattr(DummyClient, "api", patched_api)
 
 
+@pytest.fixture
+def mock_snapshot_store():
+    """DummyHass has no storage, so keep the device snapshot out of setup."""
+    with patch(
+        "custom_components.surepcha.__init__.DeviceSnapshotStore", autospec=True
+    ) as store:
+        store.return_value.async_load.return_value = None
+        yield store
+
+
 @pytest.mark.asyncio
+@pytest.mark.usefixtures("mock_snapshot_store")
 async def test_async_setup_entry_and_unload():
     hass = DummyHass()
     entry = DummyConfigEntry()
@@ -297,6 +310,7 @@ def test_import_init():
 
 
 @pytest.mark.asyncio
+@pytest.mark.usefixtures("mock_snapshot_store")
 async def test_async_setup_entry_login_failure():
     hass = DummyHass()
     entry = DummyConfigEntry()
@@ -320,7 +334,35 @@ async def test_async_setup_entry_login_failure():
             )
 
 
+@pytest.mark.parametrize(
+    ("error", "expected"),
+    [
+        (TimeoutError(), ConfigEntryNotReady),
+        (ClientError(), ConfigEntryNotReady),
+        (RuntimeError("invalid token"), ConfigEntryAuthFailed),
+    ],
+)
+async def test_login_failure_types(
+    hass: HomeAssistant, error: Exception, expected: type[Exception]
+) -> None:
+    """Unreachable servers retry the setup, other login failures need reauth."""
+    entry = MockConfigEntry(
+        domain=DOMAIN, data={TOKEN: "token", CLIENT_DEVICE_ID: "device"}
+    )
+
+    class RaisingClient(DummyClient):
+        async def login(self, token, device_id) -> bool:
+            raise error
+
+    with (
+        patch("custom_components.surepcha.__init__.SurePetcareClient", RaisingClient),
+        pytest.raises(expected),
+    ):
+        await surepetcare_init.login(hass, entry)
+
+
 @pytest.mark.asyncio
+@pytest.mark.usefixtures("mock_snapshot_store")
 async def test_async_setup_entry_api_exception():
     hass = DummyHass()
     entry = DummyConfigEntry()
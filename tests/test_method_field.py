@@ -16,7 +16,11 @@ from custom_components.surepcha.method_field import (
     SelectMethodField,
     SwitchMethodField,
     build_nested_dict,
+    build_payload,
+    compile_path,
     get_by_path,
+    merge_nested,
+    set_by_path,
 )
 
 
@@ -50,6 +54,43 @@ class TestBuildNestedDict:
         }
 
 
+class TestMergeNested:
+    """Tests for merge_nested and build_payload helper functions."""
+
+    def test_merges_list_indices(self):
+        """Test that writes to different list items are combined."""
+        payload = build_payload(
+            [
+                ("control.bowls.settings[0].target", 10),
+                ("control.bowls.settings[1].target", 20),
+                ("control.lid.close_delay", 4),
+            ]
+        )
+        assert payload == {
+            "control": {
+                "bowls": {"settings": [{"target": 10}, {"target": 20}]},
+                "lid": {"close_delay": 4},
+            }
+        }
+
+    def test_last_write_wins(self):
+        """Test that a later write to the same path replaces the earlier one."""
+        payload = build_payload(
+            [
+                ("control.bowls.settings[1].target", 20),
+                ("control.bowls.settings[0].food_type", 1),
+                ("control.bowls.settings[1].target", 30),
+            ]
+        )
+        assert payload == {
+            "control": {"bowls": {"settings": [{"food_type": 1}, {"target": 30}]}}
+        }
+
+    def test_value_replaces_nested_dict(self):
+        """Test that a plain value replaces a nested dict at the same path."""
+        assert merge_nested({"a": {"b": 1}}, {"a": 2}) == {"a": 2}
+
+
 class TestGetByPath:
     """Tests for get_by_path helper function."""
 
@@ -125,6 +166,70 @@ class TestGetByPath:
         assert get_by_path(device, "bowls[0].target") is None
 
 
+class TestCompilePath:
+    """Tests for compile_path helper function."""
+
+    @pytest.mark.parametrize(
+        ("device", "path", "expected"),
+        [
+            ({"bowls": [{"target": 100}]}, "bowls[0].target", 100),
+            ({"bowls": [1, 2]}, "bowls[1]", 2),
+            ({"status": {"value": 0}}, "status.value", 0),
+            (MagicMock(status=MagicMock(value=1)), "status.value", 1),
+            ({"bowls": [{"target": 100}]}, "bowls[3].target", None),
+            ({"bowls": {"0": 1}}, "bowls[0]", None),
+            ({"bowls": None}, "bowls[0].target", None),
+            ({"status": None}, "status.value", None),
+            ({"status": {"value": 1}}, "status.value.deeper", None),
+            (None, "status.value", None),
+        ],
+    )
+    def test_values(self, device, path, expected):
+        """Test the compiled getter returns what the path points to, or None."""
+        assert compile_path(path)(device) == expected
+
+    def test_dict_path(self):
+        """Test compiling a dict of paths."""
+        device = {"status": {"temp": 20, "humidity": 60}}
+        get = compile_path({"t": "status.temp", "h": "status.humidity"})
+        assert get(device) == {"t": 20, "h": 60}
+
+    def test_compiled_once(self):
+        """Test a path is only parsed the first time it is used."""
+        assert compile_path("status.bowl_status[0].current_weight") is compile_path(
+            "status.bowl_status[0].current_weight"
+        )
+
+
+class TestSetByPath:
+    """Tests for set_by_path helper function."""
+
+    def test_nested_attribute(self):
+        """Test setting a nested attribute."""
+        device = MagicMock()
+        assert set_by_path(device, "control.curfew.enabled", True)
+        assert device.control.curfew.enabled is True
+
+    def test_list_index(self):
+        """Test setting an item of a list."""
+        device = {"control": {"bowls": [{"target": 1}, {"target": 2}]}}
+        assert set_by_path(device, "control.bowls[1].target", 5)
+        assert device["control"]["bowls"] == [{"target": 1}, {"target": 5}]
+
+    def test_list_item(self):
+        """Test replacing a list item itself."""
+        device = {"settings": [1, 2]}
+        assert set_by_path(device, "settings[0]", 3)
+        assert device["settings"] == [3, 2]
+
+    def test_missing_path(self):
+        """Test that a missing path is not created."""
+        device = {"control": {}}
+        assert not set_by_path(device, "control.bowls[0].target", 1)
+        assert not set_by_path(device, "status.online", True)
+        assert device == {"control": {}}
+
+
 class TestMethodField:
     """Tests for MethodField base class."""
 
@@ -146,8 +251,10 @@ class TestMethodField:
         field = MethodField(path="control.led_mode")
         options = MappingProxyType({})
 
-        field.set(FieldContext(device, options, None), 2)
+        context = FieldContext(device, options, None)
+        field.set(context, 2)
         device.set_control.assert_called_once_with(control={"led_mode": 2})
+        assert context.writes == [("control.led_mode", 2)]
 
     def test_with_nested_path_set(self):
         """Test MethodField.set with nested path."""
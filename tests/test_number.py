@@ -1,15 +1,24 @@
+from collections.abc import Callable
+from datetime import timedelta
 from unittest.mock import patch
 
 import pytest
 from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers import entity_registry as er
+from homeassistant.util import dt as dt_util
 from pytest_homeassistant_custom_component.common import (
     MockConfigEntry,
+    async_fire_time_changed,
     snapshot_platform,
 )
 from syrupy.assertion import SnapshotAssertion
 
+from custom_components.surepcha.const import (
+    DEFAULT_COMMAND_REFRESH_DELAY,
+    NUMBER_DEBOUNCE,
+)
+
 from . import initialize_entry
 
 
@@ -101,3 +110,107 @@ async def test_number_set_and_snapshot(
             updated_state = hass.states.get(entity_id)
             assert updated_state is not None
             assert updated_state == snapshot(name=f"{entity_id}-{value}")
+
+
+@patch("custom_components.surepcha.PLATFORMS", [Platform.NUMBER])
+@pytest.mark.usefixtures("enable_custom_integrations")
+@pytest.mark.usefixtures("entity_registry_enabled_default")
+@pytest.mark.asyncio
+async def test_number_debounce_sends_final_value(
+    hass: HomeAssistant,
+    mock_client,
+    entry_with_options: Callable[..., MockConfigEntry],
+    mock_devices,
+    mock_pets,
+) -> None:
+    """Only the value a slider settles on is sent, and it shows right away."""
+    entry = entry_with_options(**{NUMBER_DEBOUNCE: 1.0})
+    await initialize_entry(hass, mock_client, entry, mock_devices, mock_pets)
+    entity_id = hass.states.async_entity_ids("number")[0]
+    calls = mock_client.api.await_count
+
+    for value in (10.0, 20.0, 30.0):
+        await hass.services.async_call(
+            "number",
+            "set_value",
+            {"entity_id": entity_id, "value": value},
+            blocking=True,
+        )
+
+    assert hass.states.get(entity_id).state == "30.0"
+    assert mock_client.api.await_count == calls
+
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=1))
+    await hass.async_block_till_done()
+
+    assert mock_client.api.await_count == calls + 1
+    assert hass.states.get(entity_id).state == "30.0"
+
+
+@patch("custom_components.surepcha.PLATFORMS", [Platform.NUMBER])
+@pytest.mark.usefixtures("enable_custom_integrations")
+@pytest.mark.usefixtures("entity_registry_enabled_default")
+@pytest.mark.asyncio
+async def test_number_debounce_drops_value_that_failed(
+    hass: HomeAssistant,
+    mock_client,
+    entry_with_options: Callable[..., MockConfigEntry],
+    mock_devices,
+    mock_pets,
+) -> None:
+    """A debounced value is shown until the command sending it fails."""
+    entry = entry_with_options(**{NUMBER_DEBOUNCE: 1.0})
+    await initialize_entry(hass, mock_client, entry, mock_devices, mock_pets)
+    entity_id = hass.states.async_entity_ids("number")[0]
+    initial = hass.states.get(entity_id).state
+    mock_client.api.side_effect = RuntimeError("rejected")
+
+    await hass.services.async_call(
+        "number",
+        "set_value",
+        {"entity_id": entity_id, "value": 30.0},
+        blocking=True,
+    )
+    assert hass.states.get(entity_id).state == "30.0"
+
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=1))
+    await hass.async_block_till_done()
+
+    assert hass.states.get(entity_id).state == initial
+
+
+@patch("custom_components.surepcha.PLATFORMS", [Platform.NUMBER])
+@pytest.mark.usefixtures("enable_custom_integrations")
+@pytest.mark.usefixtures("entity_registry_enabled_default")
+@pytest.mark.asyncio
+async def test_number_debounce_shows_value_kept_by_cloud(
+    hass: HomeAssistant,
+    mock_client,
+    entry_with_options: Callable[..., MockConfigEntry],
+    mock_devices,
+    mock_pets,
+) -> None:
+    """The refresh after the command replaces the value, even if unchanged."""
+    entry = entry_with_options(**{NUMBER_DEBOUNCE: 1.0})
+    await initialize_entry(hass, mock_client, entry, mock_devices, mock_pets)
+    entity_id = hass.states.async_entity_ids("number")[0]
+    initial = hass.states.get(entity_id).state
+
+    await hass.services.async_call(
+        "number",
+        "set_value",
+        {"entity_id": entity_id, "value": 30.0},
+        blocking=True,
+    )
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=1))
+    await hass.async_block_till_done()
+    assert hass.states.get(entity_id).state == "30.0"
+
+    # The cloud ignored the write, so the refresh brings back the old value.
+    async_fire_time_changed(
+        hass,
+        dt_util.utcnow() + timedelta(seconds=1 + DEFAULT_COMMAND_REFRESH_DELAY),
+    )
+    await hass.async_block_till_done()
+
+    assert hass.states.get(entity_id).state == initial
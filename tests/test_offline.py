@@ -0,0 +1,134 @@
+from datetime import timedelta
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from aiohttp import ClientConnectionError
+from freezegun.api import FrozenDateTimeFactory
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+
+from custom_components.surepcha.api import SurePetcareApi
+from custom_components.surepcha.const import CONTROL_BATCH_DELAY, DOMAIN
+from custom_components.surepcha.coordinator import (
+    SurePetCareDeviceDataUpdateCoordinator,
+)
+from custom_components.surepcha.offline import (
+    REPLAY_BASE_DELAY,
+    REPLAY_MAX_DELAY,
+    SAVE_DELAY,
+    OfflineCommandStore,
+    replay_delay,
+)
+
+
+async def test_offline_store_coalesces_writes(hass: HomeAssistant) -> None:
+    """A newer write to a path replaces the queued one."""
+    store = OfflineCommandStore(hass, MockConfigEntry(domain=DOMAIN), 3600)
+
+    store.add(1, [("control.locking", 1), ("control.curfew.enabled", True)])
+    store.add(1, [("control.locking", 2)])
+    store.add(2, [("control.locking", 3)])
+
+    assert store.pending(1) == [
+        ("control.curfew.enabled", True),
+        ("control.locking", 2),
+    ]
+    store.remove(1, ["control.locking"])
+    assert store.pending(1) == [("control.curfew.enabled", True)]
+    assert store.as_dict() == {
+        "pending": 2,
+        "queued": 4,
+        "coalesced": 1,
+        "expired": 0,
+        "sent": 1,
+    }
+
+
+async def test_offline_store_drops_expired_writes(
+    hass: HomeAssistant, freezer: FrozenDateTimeFactory
+) -> None:
+    """Writes older than the ttl are not replayed, failing again keeps their age."""
+    store = OfflineCommandStore(hass, MockConfigEntry(domain=DOMAIN), 60)
+
+    store.add(1, [("control.locking", 1)])
+    freezer.tick(timedelta(seconds=45))
+    store.add(1, [("control.locking", 1)])
+    freezer.tick(timedelta(seconds=30))
+
+    assert store.pending(1) == []
+    assert store.as_dict()["expired"] == 1
+
+
+async def test_offline_store_survives_restart(
+    hass: HomeAssistant, hass_storage: dict[str, Any]
+) -> None:
+    """Queued writes are saved and loaded again."""
+    entry = MockConfigEntry(domain=DOMAIN)
+    store = OfflineCommandStore(hass, entry, 3600)
+    store.add(1, [("control.locking", 1)])
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=SAVE_DELAY))
+    await hass.async_block_till_done()
+
+    assert f"{DOMAIN}.offline.{entry.entry_id}" in hass_storage
+    restored = OfflineCommandStore(hass, entry, 3600)
+    await restored.async_load()
+    assert restored.pending(1) == [("control.locking", 1)]
+
+
+def test_replay_delay_backs_off() -> None:
+    """Every failed replay doubles the wait, up to the maximum."""
+    assert replay_delay(1) == REPLAY_BASE_DELAY
+    assert replay_delay(2) == REPLAY_BASE_DELAY * 2
+    assert replay_delay(100) == REPLAY_MAX_DELAY
+
+
+async def test_failed_write_is_replayed(hass: HomeAssistant) -> None:
+    """A write that failed is kept and sent once the device can be reached."""
+    entry = MockConfigEntry(domain=DOMAIN, options={CONTROL_BATCH_DELAY: 0})
+    client = MagicMock()
+    client.api = AsyncMock(side_effect=[ClientConnectionError("offline"), "ok"])
+    offline = OfflineCommandStore(hass, entry, 3600)
+    coordinator = SurePetCareDeviceDataUpdateCoordinator(
+        hass, entry, SurePetcareApi(hass, client), MagicMock(id=1), offline=offline
+    )
+
+    future = coordinator.commands.write(
+        {"control": {"locking": 1}}, [("control.locking", 1)]
+    )
+    await hass.async_block_till_done()
+    with pytest.raises(ClientConnectionError):
+        await future
+    assert offline.pending(1) == [("control.locking", 1)]
+
+    await coordinator.async_replay_offline()
+
+    assert client.api.await_count == 2
+    assert offline.pending(1) == []
+    assert coordinator.command_diagnostics()["offline_pending"] == 0
+    await coordinator.async_shutdown()
+
+
+async def test_rejected_write_is_not_kept(hass: HomeAssistant) -> None:
+    """Only writes that did not reach the cloud are kept for a replay."""
+    entry = MockConfigEntry(domain=DOMAIN, options={CONTROL_BATCH_DELAY: 0})
+    client = MagicMock()
+    client.api = AsyncMock(side_effect=ValueError("invalid locking mode"))
+    offline = OfflineCommandStore(hass, entry, 3600)
+    coordinator = SurePetCareDeviceDataUpdateCoordinator(
+        hass, entry, SurePetcareApi(hass, client), MagicMock(id=1), offline=offline
+    )
+
+    future = coordinator.commands.write(
+        {"control": {"locking": 9}}, [("control.locking", 9)]
+    )
+    await hass.async_block_till_done()
+    with pytest.raises(ValueError, match="invalid locking mode"):
+        await future
+
+    assert offline.pending(1) == []
+    await coordinator.async_shutdown()
@@ -0,0 +1,95 @@
+import pytest
+
+from custom_components.surepcha.polling import (
+    BREAKER_JITTER,
+    AdaptiveInterval,
+    CircuitBreaker,
+    next_poll_delay,
+    poll_phases,
+    stable_fraction,
+)
+
+
+def test_poll_phases_are_spread_evenly() -> None:
+    """Every id gets its own slot of the interval."""
+    phases = poll_phases(range(4), seed="household")
+    base = stable_fraction("household")
+
+    slots = sorted(int(((p - base) % 1.0) * 4) for p in phases.values())
+    assert slots == [0, 1, 2, 3]
+
+
+def test_poll_phases_are_deterministic() -> None:
+    """The same ids and seed always give the same phases, in any order."""
+    assert poll_phases([3, 1, 2], seed=1) == poll_phases([1, 2, 3], seed=1)
+    assert poll_phases([1, 2, 3], seed=1) != poll_phases([1, 2, 3], seed=2)
+
+
+@pytest.mark.parametrize(
+    ("now", "expected"),
+    [
+        (0.0, 30.0),
+        (10.0, 20.0),
+        (29.0, 301.0),
+        (30.0, 300.0),
+    ],
+)
+def test_next_poll_delay_lands_on_phase(now: float, expected: float) -> None:
+    """The next poll is on the phase slot, but never closer than the minimum gap."""
+    assert next_poll_delay(now, interval=300, phase=0.1) == pytest.approx(expected)
+
+
+def test_next_poll_delay_short_interval() -> None:
+    """Short intervals still poll every interval."""
+    assert next_poll_delay(4.0, interval=5, phase=0.0) == pytest.approx(6.0)
+
+
+def test_adaptive_interval_backs_off_while_unchanged() -> None:
+    """Unchanged data stretches the interval up to the maximum."""
+    adaptive = AdaptiveInterval(300, minimum=30, maximum=600)
+
+    assert adaptive.update(1, now=0) == 300
+    assert adaptive.update(1, now=300) == 450
+    assert adaptive.update(1, now=750) == 600
+    assert adaptive.update(1, now=1350) == 600
+
+
+def test_adaptive_interval_speeds_up_on_changes() -> None:
+    """Changes shrink the interval below the average gap between them."""
+    adaptive = AdaptiveInterval(300, minimum=30, maximum=600)
+    adaptive.update(1, now=0)
+
+    assert adaptive.update(2, now=100) == 50
+    assert adaptive.change_gap == 100
+    assert adaptive.update(3, now=140) == 30
+    assert adaptive.as_dict() == {
+        "interval": 30,
+        "minimum": 30,
+        "maximum": 600,
+        "change_gap": 82.0,
+    }
+
+
+def test_circuit_breaker_backs_off_and_probes() -> None:
+    """The breaker opens after the threshold and lets one probe through."""
+    breaker = CircuitBreaker(100, threshold=2)
+    low, high = 1 - BREAKER_JITTER, 1 + BREAKER_JITTER
+    breaker.record_failure(now=0)
+    assert breaker.allow(now=0)
+
+    breaker.record_failure(now=0)
+    assert not breaker.allow(now=0)
+    assert 100 * low <= breaker.retry_in(0) <= 100 * high
+
+    assert breaker.allow(now=200)
+    assert not breaker.allow(now=200)
+    breaker.record_failure(now=200)
+    assert 200 * low <= breaker.retry_in(200) <= 200 * high
+
+    assert breaker.allow(now=1000)
+    breaker.record_success()
+    assert breaker.as_dict(1000) == {
+        "state": "closed",
+        "failures": 0,
+        "retry_in": None,
+    }
@@ -1,3 +1,4 @@
+from types import SimpleNamespace
 from unittest.mock import patch
 
 import pytest
@@ -10,6 +11,9 @@ from pytest_homeassistant_custom_component.common import (
 )
 from syrupy.assertion import SnapshotAssertion
 
+from custom_components.surepcha.const import NAME, OPTION_DEVICES
+from custom_components.surepcha.select import tag_affects
+
 from . import initialize_entry
 
 
@@ -98,3 +102,14 @@ async def test_select_set_option_and_snapshot(
             updated_state = hass.states.get(entity_id)
             assert updated_state is not None
             assert updated_state == snapshot(name=f"{entity_id}-{option}")
+
+
+def test_tag_affects_pet_and_selected_device() -> None:
+    """Changing a pet's tag affects the pet and the device picked by name."""
+    ctx = SimpleNamespace(
+        device=SimpleNamespace(id=1),
+        options={OPTION_DEVICES: {"2": {NAME: "Flap"}, "3": {NAME: "Feeder"}}},
+    )
+
+    assert tag_affects(ctx, "Feeder") == {"1", "3"}
+    assert tag_affects(ctx, "Unknown") == {"1"}
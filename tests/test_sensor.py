@@ -1,4 +1,4 @@
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
 import pytest
 from homeassistant.const import Platform
@@ -10,6 +10,12 @@ from pytest_homeassistant_custom_component.common import (
 )
 from syrupy.assertion import SnapshotAssertion
 
+from custom_components.surepcha.method_field import MethodField
+from custom_components.surepcha.sensor import (
+    SurePetCareSensor,
+    SurePetCareSensorEntityDescription,
+)
+
 from . import initialize_entry
 
 
@@ -51,3 +57,41 @@ async def test_platform_setup_and_discovery_missing_entities(
     await snapshot_platform(
         hass, entity_registry, snapshot, mock_config_entry_missing_entities.entry_id
     )
+
+
+@patch("custom_components.surepcha.PLATFORMS", [Platform.SENSOR])
+@pytest.mark.usefixtures("enable_custom_integrations")
+@pytest.mark.asyncio
+async def test_values_are_cached_per_update(
+    hass: HomeAssistant,
+    mock_client,
+    mock_config_entry: MockConfigEntry,
+    mock_devices,
+    mock_pets,
+) -> None:
+    """A None value is cached too, until the coordinator's next update."""
+    await initialize_entry(
+        hass, mock_client, mock_config_entry, mock_devices, mock_pets
+    )
+    coordinator = mock_config_entry.runtime_data[0]
+    get_fn = MagicMock(return_value=None)
+    get_fn.__name__ = "get_fn"
+    sensor = SurePetCareSensor(
+        coordinator,
+        SurePetCareSensorEntityDescription(
+            key="cached", field=MethodField(get_fn=get_fn)
+        ),
+    )
+
+    assert sensor.native_value is None
+    assert sensor.native_value is None
+    assert sensor.extra_state_attributes is None
+    assert sensor.entity_picture is None
+    assert get_fn.call_count == 1
+    assert (sensor.cache_hits, sensor.cache_misses) == (2, 3)
+
+    with patch("custom_components.surepcha.coordinator.fingerprint", return_value=0):
+        coordinator.async_set_updated_data(coordinator._device)
+    assert sensor.native_value is None
+    assert get_fn.call_count == 2
+    assert sensor.cache_misses == 4
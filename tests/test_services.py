@@ -18,6 +18,7 @@ from surepcio.enums import (
 from syrupy.assertion import SnapshotAssertion
 
 from custom_components.surepcha.const import DOMAIN
+from custom_components.surepcha.services import get_coordinator
 
 from . import initialize_entry
 
@@ -102,6 +103,14 @@ async def test_platform_setup_and_set_tag_service(
         {"device_id": device_id, "pet_id": pet_id, "action": ModifyDeviceTag.ADD.name},
         blocking=True,
     )
+    await hass.async_block_till_done()
+
+    # Both the device's tag list and the pet's devices are refreshed.
+    for coordinator in (
+        get_coordinator(hass, device_id),
+        get_coordinator(hass, pet_id),
+    ):
+        assert coordinator.command_refresh_requests == 2
 
 
 @patch("custom_components.surepcha.PLATFORMS", [Platform.SENSOR])
@@ -0,0 +1,146 @@
+import json
+from datetime import timedelta
+from typing import Any
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import STATE_UNAVAILABLE
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+from surepcio import SurePetcareClient
+from surepcio.devices.device import DeviceBase, PetBase
+
+from custom_components.surepcha.const import ATTR_CACHED_AT, DOMAIN, SNAPSHOT_CACHE
+from custom_components.surepcha.helper import fingerprint
+from custom_components.surepcha.snapshot import (
+    SAVE_DELAY,
+    STORAGE_VERSION,
+    dump_device,
+    restore_device,
+)
+
+from . import initialize_entry
+
+
+def _storage_key(entry: MockConfigEntry) -> str:
+    return f"{DOMAIN}.snapshot.{entry.entry_id}"
+
+
+def _store_snapshot(
+    hass_storage: dict[str, Any], entry: MockConfigEntry, devices: list, saved_at
+) -> None:
+    hass_storage[_storage_key(entry)] = {
+        "version": STORAGE_VERSION,
+        "minor_version": 1,
+        "key": _storage_key(entry),
+        "data": {
+            "saved_at": saved_at.isoformat(),
+            "devices": [dump_device(device) for device in devices],
+        },
+    }
+
+
+async def test_dump_and_restore_device(
+    mock_devices: list[DeviceBase], mock_pets: list[PetBase]
+) -> None:
+    """A restored device has the same identity and state as the original."""
+    for device in [*mock_pets, *mock_devices]:
+        data = json.loads(json.dumps(dump_device(device)))
+        restored = restore_device(data)
+
+        assert type(restored) is type(device)
+        assert restored.id == device.id
+        assert fingerprint(restored) == fingerprint(device)
+
+
+@pytest.mark.usefixtures("enable_custom_integrations")
+async def test_snapshot_saved_after_setup(
+    hass: HomeAssistant,
+    hass_storage: dict[str, Any],
+    mock_client: SurePetcareClient,
+    mock_config_entry: MockConfigEntry,
+    mock_devices: list[DeviceBase],
+    mock_pets: list[PetBase],
+) -> None:
+    """The refreshed devices are written to the snapshot."""
+    await initialize_entry(
+        hass, mock_client, mock_config_entry, mock_devices, mock_pets
+    )
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=SAVE_DELAY))
+    await hass.async_block_till_done()
+
+    data = hass_storage[_storage_key(mock_config_entry)]["data"]
+    assert len(data["devices"]) == len(mock_config_entry.runtime_data)
+
+
+@pytest.mark.usefixtures("enable_custom_integrations")
+async def test_setup_from_snapshot(
+    hass: HomeAssistant,
+    hass_storage: dict[str, Any],
+    mock_client: SurePetcareClient,
+    mock_config_entry: MockConfigEntry,
+    mock_devices: list[DeviceBase],
+    mock_pets: list[PetBase],
+) -> None:
+    """Entities are created from the snapshot while the API is unreachable."""
+    saved_at = dt_util.utcnow() - timedelta(hours=1)
+    _store_snapshot(
+        hass_storage, mock_config_entry, [*mock_pets, *mock_devices], saved_at
+    )
+    api = mock_client.api
+    mock_client.api = AsyncMock(side_effect=RuntimeError("offline"))
+    mock_config_entry.add_to_hass(hass)
+
+    with patch(
+        "custom_components.surepcha.SurePetcareClient", return_value=mock_client
+    ):
+        await hass.config_entries.async_setup(mock_config_entry.entry_id)
+        await hass.async_block_till_done()
+
+    assert mock_config_entry.state is ConfigEntryState.LOADED
+    coordinators = mock_config_entry.runtime_data
+    assert [c._device.id for c in coordinators] == [
+        device.id for device in [*mock_pets, *mock_devices]
+    ]
+    assert {c.cached_at for c in coordinators} == {saved_at}
+    states = [s for s in hass.states.async_all() if s.state != STATE_UNAVAILABLE]
+    assert states
+    assert {s.attributes.get(ATTR_CACHED_AT) for s in states} == {saved_at}
+
+    # The first live refresh drops the attribute again.
+    mock_client.api = api
+    for coordinator in coordinators:
+        await coordinator.async_refresh()
+    await hass.async_block_till_done()
+    assert not any(ATTR_CACHED_AT in s.attributes for s in hass.states.async_all())
+
+
+@pytest.mark.usefixtures("enable_custom_integrations")
+async def test_snapshot_opt_out(
+    hass: HomeAssistant,
+    hass_storage: dict[str, Any],
+    mock_client: SurePetcareClient,
+    mock_config_entry: MockConfigEntry,
+    mock_devices: list[DeviceBase],
+    mock_pets: list[PetBase],
+) -> None:
+    """With the snapshot disabled, devices are always fetched from the API."""
+    entry = MockConfigEntry(
+        title=mock_config_entry.title,
+        domain=DOMAIN,
+        data=dict(mock_config_entry.data),
+        options={**mock_config_entry.options, SNAPSHOT_CACHE: False},
+        unique_id=mock_config_entry.unique_id,
+    )
+    _store_snapshot(hass_storage, entry, mock_devices, dt_util.utcnow())
+
+    await initialize_entry(hass, mock_client, entry, mock_devices, mock_pets)
+
+    assert mock_client.api.await_count
+    assert len(entry.runtime_data) == len(mock_devices) + len(mock_pets)
+    assert {c.cached_at for c in entry.runtime_data} == {None}